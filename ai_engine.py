@@ -1,13 +1,49 @@
 import re
+import copy
 import json
+import functools
+import threading
+import uuid
 from collections import defaultdict
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Tuple, Iterable, Optional
 import pickle
 import os
+import numpy as np
+from language_classifier import LanguageClassifier
+from symbol_table import StringPool, SymbolSet, PrefixIndex
+
+def synchronized(method):
+    """Exécute la méthode sous le verrou du moteur: la base est partagée entre l'interface,
+    l'entraînement et la surveillance, et les ensembles de symboles ne supportent pas
+    une lecture pendant une écriture"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.lock:
+            return method(self, *args, **kwargs)
+    return wrapper
 
 class AIEngine:
-    def __init__(self):
+    SYMBOL_KEYS = ('functions', 'classes', 'imports')
+    KNOWLEDGE_BASE_FORMAT = 2
+    
+    def __init__(self, knowledge_base_path: Optional[str] = 'knowledge_base.pkl'):
+        """knowledge_base_path: fichier de la base de connaissances, ou None pour une base en mémoire"""
+        self.lock = threading.RLock()
         self.knowledge_base = defaultdict(dict)
+        self.symbol_pool = StringPool()
+        # Identité de la base: les index externes (OID Git appris) y sont rattachés
+        self.knowledge_base_id = uuid.uuid4().hex
+        # Langages dont les données dérivées (patterns courants, recommandations) sont à recalculer
+        self.dirty_languages = set()
+        # Index de complétion par langage (None: toutes langues), servis tels quels entre deux
+        # reconstructions (rebuild_completion_indexes), après un entraînement ou un lot surveillé
+        self._completion_indexes = {}
+        self._stale_completions = set()
+        self._completion_rebuild_lock = threading.Lock()
+        self.knowledge_base_path = knowledge_base_path
+        self.classifier_path = None
+        if knowledge_base_path is not None:
+            self.classifier_path = os.path.join(os.path.dirname(knowledge_base_path), 'language_classifier.npz')
         self.language_patterns = {
             'python': [r'def\s+\w+', r'import\s+\w+', r'class\s+\w+', r'if\s+__name__\s*==\s*["\']__main__["\']'],
             'javascript': [r'function\s+\w+', r'const\s+\w+', r'let\s+\w+', r'var\s+\w+', r'=>'],
@@ -15,7 +51,7 @@ class AIEngine:
             'cpp': [r'#include\s*<\w+>', r'int\s+main\s*\(', r'std::', r'cout\s*<<'],
             'c': [r'#include\s*<\w+\.h>', r'int\s+main\s*\(', r'printf\s*\('],
             'html': [r'<html>', r'<head>', r'<body>', r'<div>', r'<!DOCTYPE'],
-            'css': [r'\w+\s*{', r':\s*\w+;', r'@media', r'#\w+'],
+            'css': [r'\b\w+\s*{', r':\s*\w+;', r'@media', r'#\w+'],
             'sql': [r'SELECT\s+', r'FROM\s+', r'WHERE\s+', r'INSERT\s+INTO', r'CREATE\s+TABLE'],
             'php': [r'<\?php', r'\$\w+', r'function\s+\w+', r'class\s+\w+'],
             'ruby': [r'def\s+\w+', r'class\s+\w+', r'require\s+', r'puts\s+'],
@@ -34,26 +70,113 @@ class AIEngine:
             'comments': r'(?://.*|/\*.*?\*/|#.*|<!--.*?-->)',
         }
         
+        self.language_classifier = None
+        
+        # Détection par préfixe: taille initiale, plafond et marge de confiance requise
+        self.detection_prefix_size = 4096
+        self.detection_max_size = 262144
+        self.detection_confidence = 0.5
+        self.detection_min_hits = 3
+        # Analyse en flux: une ligne plus longue est lue et traitée par morceaux de cette taille
+        self.stream_segment_size = 65536
+        
         self.load_knowledge_base()
+        self.load_language_classifier()
     
     def detect_language(self, code: str) -> str:
         """Détecte le langage de programmation du code"""
+        return self.detect_language_with_confidence(code)[0]
+    
+    def detect_language_with_confidence(self, code: str) -> Tuple[str, float]:
+        """Détecte le langage sur un préfixe élargi seulement si le résultat reste ambigu
+        
+        La confiance est l'écart normalisé (entre 0 et 1) entre les deux meilleurs langages.
+        """
+        # Référence locale: le classifieur peut être remplacé par un entraînement concurrent
+        classifier = self.language_classifier
+        use_classifier = classifier is not None and classifier.is_fitted
         scores = defaultdict(int)
+        scanned = 0
+        window = self.detection_prefix_size
+        
+        while True:
+            end = min(len(code), window, self.detection_max_size)
+            # Couper en fin de ligne pour ne pas scinder un motif
+            if end < len(code):
+                newline = code.find('\n', end)
+                if newline != -1 and newline - end < 1024:
+                    end = newline + 1
+            
+            if use_classifier:
+                probabilities = classifier.predict_proba([code[:end]])[0]
+                scores = dict(zip(classifier.classes, probabilities.tolist()))
+                total, enough_hits = 1.0, True
+            else:
+                for language, count in self._pattern_scores(code[scanned:end]).items():
+                    scores[language] += count
+                total = sum(scores.values())
+                enough_hits = total >= self.detection_min_hits
+            scanned = end
+            
+            language = max(scores, key=scores.get)
+            ranked = sorted(scores.values(), reverse=True)
+            margin = ranked[0] - (ranked[1] if len(ranked) > 1 else 0)
+            confidence = margin / total if total else 0.0
+            
+            if scanned >= len(code) or scanned >= self.detection_max_size:
+                return language, confidence
+            if enough_hits and confidence >= self.detection_confidence:
+                return language, confidence
+            
+            window *= 4
+    
+    def detect_languages(self, codes: List[str]) -> List[str]:
+        """Détecte le langage d'un lot de codes en une seule passe matricielle"""
+        classifier = self.language_classifier
+        if classifier is not None and classifier.is_fitted:
+            return classifier.predict(codes)
+        
+        return [self.detect_language(code) for code in codes]
+    
+    def _pattern_scores(self, code: str) -> Dict[str, int]:
+        """Compte les occurrences des motifs de chaque langage"""
+        scores = {}
         
         for language, patterns in self.language_patterns.items():
+            scores[language] = 0
             for pattern in patterns:
                 matches = re.findall(pattern, code, re.IGNORECASE | re.MULTILINE)
                 scores[language] += len(matches)
         
+        return scores
+    
+    def detect_language_by_patterns(self, code: str) -> str:
+        """Détecte le langage par comptage des expressions régulières sur tout le code"""
+        scores = self._pattern_scores(code)
+        
         if not scores:
             return 'unknown'
         
         return max(scores, key=scores.get)
     
+    def evaluate_language_detection(self, codes: List[str], labels: List[str]) -> Dict[str, Any]:
+        """Compare sur des exemples étiquetés le classifieur statistique et le vote par motifs"""
+        evaluation = {
+            'samples': len(codes),
+            'patterns_accuracy': (sum(self.detect_language_by_patterns(code) == label
+                                      for code, label in zip(codes, labels)) / len(codes)) if codes else 0.0,
+            'classifier_accuracy': None
+        }
+        if self.language_classifier is not None and self.language_classifier.is_fitted:
+            evaluation['classifier_accuracy'] = self.language_classifier.accuracy(codes, labels)
+        return evaluation
+    
     def extract_code_features(self, code: str) -> Dict[str, Any]:
         """Extrait les caractéristiques du code"""
+        language, confidence = self.detect_language_with_confidence(code)
         features = {
-            'language': self.detect_language(code),
+            'language': language,
+            'language_confidence': confidence,
             'functions': [],
             'classes': [],
             'variables': [],
@@ -93,41 +216,125 @@ class AIEngine:
     def analyze_code(self, code: str) -> str:
         """Analyse le code et retourne un rapport détaillé"""
         features = self.extract_code_features(code)
-        
+        quality_analysis = self.analyze_code_quality(code, features)
+        return self.format_analysis_report(features, quality_analysis)
+    
+    def analyze_stream(self, lines: Iterable[str]) -> str:
+        """Analyse un flux de lignes (fichier ouvert, itérateur) à mémoire bornée"""
+        features = self.extract_stream_features(lines)
+        quality_analysis = self._quality_issues(features, features['long_lines_count'])
+        return self.format_analysis_report(features, quality_analysis)
+    
+    def analyze_file(self, file_path: str) -> str:
+        """Analyse un fichier sur disque sans le charger entièrement en mémoire"""
+        with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+            # readline borné: une ligne de plusieurs Mo n'est jamais chargée d'un bloc
+            return self.analyze_stream(iter(lambda: f.readline(self.stream_segment_size), ''))
+    
+    def extract_stream_features(self, lines: Iterable[str], chunk_size: int = 1 << 20,
+                                sample_size: int = 10) -> Dict[str, Any]:
+        """Extrait les caractéristiques d'un flux de lignes par blocs
+        
+        Les lignes gardent leur fin de ligne, comme celles d'un fichier ouvert: un élément
+        sans '\\n' final est continué par le suivant, ce qui permet de lire une ligne démesurée
+        par morceaux. Seuls des compteurs et des échantillons bornés sont conservés; les listes
+        'functions', 'classes', 'imports' ne contiennent que les premiers symboles.
+        """
+        features = {
+            'functions': [],
+            'classes': [],
+            'variables': [],
+            'imports': [],
+            'comments': [],
+            'short_variables': [],
+            'lines_count': 0,
+            'long_lines_count': 0,
+            'complexity_score': 0
+        }
+        for feature_type in self.code_patterns:
+            features[f'{feature_type}_count'] = 0
+        
+        compiled = {feature_type: re.compile(pattern, re.IGNORECASE | re.MULTILINE)
+                    for feature_type, pattern in self.code_patterns.items()}
+        prefix = []
+        prefix_size = 0
+        chunk = []
+        chunk_chars = 0
+        newline_count = 0
+        line_length = 0
+        
+        def process_chunk():
+            text = ''.join(chunk)
+            for feature_type, regex in compiled.items():
+                for match in regex.finditer(text):
+                    features[f'{feature_type}_count'] += 1
+                    value = match.group(1) if regex.groups else match.group(0)
+                    if feature_type == 'variables':
+                        if self._is_short_variable(value) and len(features['short_variables']) < 5:
+                            features['short_variables'].append(value)
+                    elif feature_type != 'comments' and len(features[feature_type]) < sample_size:
+                        features[feature_type].append(value)
+            features['complexity_score'] += self.calculate_complexity(text)
+        
+        for line in lines:
+            # Une ligne reçue d'un bloc est elle aussi découpée: les blocs restent bornés
+            for start in range(0, len(line), self.stream_segment_size):
+                segment = line[start:start + self.stream_segment_size]
+                end_of_line = segment.endswith('\n')
+                line_length += len(segment) - end_of_line
+                if end_of_line:
+                    newline_count += 1
+                    if line_length > 100:
+                        features['long_lines_count'] += 1
+                    line_length = 0
+                
+                # Préfixe borné conservé pour la détection du langage
+                if prefix_size < self.detection_max_size:
+                    kept = segment[:self.detection_max_size - prefix_size]
+                    prefix.append(kept)
+                    prefix_size += len(kept)
+                
+                chunk.append(segment)
+                chunk_chars += len(segment)
+                if chunk_chars >= chunk_size:
+                    process_chunk()
+                    chunk = []
+                    chunk_chars = 0
+        
+        if chunk:
+            process_chunk()
+        if line_length > 100:
+            features['long_lines_count'] += 1
+        
+        features['lines_count'] = newline_count + 1
+        features['language'], features['language_confidence'] = \
+            self.detect_language_with_confidence(''.join(prefix))
+        return features
+    
+    def format_analysis_report(self, features: Dict[str, Any], quality_analysis: List[str]) -> str:
+        """Met en forme le rapport d'analyse à partir des caractéristiques extraites"""
         analysis = []
         analysis.append("=== ANALYSE DU CODE ===\n")
         
         # Langage détecté
-        analysis.append(f"Langage détecté: {features['language'].upper()}")
+        analysis.append(f"Langage détecté: {features['language'].upper()} (confiance: {features.get('language_confidence', 0):.0%})")
         analysis.append(f"Nombre de lignes: {features['lines_count']}")
         analysis.append(f"Score de complexité: {features['complexity_score']}\n")
         
-        # Fonctions
-        if features['functions']:
-            analysis.append(f"Fonctions trouvées ({len(features['functions'])}):")
-            for func in features['functions'][:10]:  # Limite à 10
-                analysis.append(f"  - {func}")
-            if len(features['functions']) > 10:
-                analysis.append(f"  ... et {len(features['functions']) - 10} autres")
-            analysis.append("")
-        
-        # Classes
-        if features['classes']:
-            analysis.append(f"Classes trouvées ({len(features['classes'])}):")
-            for cls in features['classes'][:10]:
-                analysis.append(f"  - {cls}")
-            if len(features['classes']) > 10:
-                analysis.append(f"  ... et {len(features['classes']) - 10} autres")
-            analysis.append("")
-        
-        # Imports
-        if features['imports']:
-            analysis.append(f"Imports/Includes ({len(features['imports'])}):")
-            for imp in features['imports'][:10]:
-                analysis.append(f"  - {imp}")
-            if len(features['imports']) > 10:
-                analysis.append(f"  ... et {len(features['imports']) - 10} autres")
-            analysis.append("")
+        sections = [
+            ('functions', "Fonctions trouvées"),
+            ('classes', "Classes trouvées"),
+            ('imports', "Imports/Includes"),
+        ]
+        for feature_type, title in sections:
+            count = self._feature_count(features, feature_type)
+            if count:
+                analysis.append(f"{title} ({count}):")
+                for item in features[feature_type][:10]:  # Limite à 10
+                    analysis.append(f"  - {item}")
+                if count > 10:
+                    analysis.append(f"  ... et {count - 10} autres")
+                analysis.append("")
         
         # Recommandations basées sur la base de connaissances
         recommendations = self.get_recommendations(features)
@@ -138,23 +345,33 @@ class AIEngine:
             analysis.append("")
         
         # Analyse de qualité
-        quality_analysis = self.analyze_code_quality(code, features)
         analysis.append("=== ANALYSE DE QUALITÉ ===")
         analysis.extend(quality_analysis)
         
         return "\n".join(analysis)
     
+    def _feature_count(self, features: Dict[str, Any], feature_type: str) -> int:
+        """Nombre total d'éléments, y compris ceux absents d'un échantillon borné"""
+        return features.get(f'{feature_type}_count', len(features[feature_type]))
+    
+    def _is_short_variable(self, name: str) -> bool:
+        return len(name) < 3 and name not in ['i', 'j', 'k', 'x', 'y', 'z']
+    
     def analyze_code_quality(self, code: str, features: Dict[str, Any]) -> List[str]:
         """Analyse la qualité du code"""
+        long_lines_count = sum(1 for line in code.split('\n') if len(line) > 100)
+        return self._quality_issues(features, long_lines_count)
+    
+    def _quality_issues(self, features: Dict[str, Any], long_lines_count: int) -> List[str]:
+        """Construit la liste des problèmes de qualité à partir de compteurs"""
         quality_issues = []
         
         # Vérification de la longueur des lignes
-        long_lines = [i+1 for i, line in enumerate(code.split('\n')) if len(line) > 100]
-        if long_lines:
-            quality_issues.append(f"Lignes trop longues (>100 caractères): {len(long_lines)} lignes")
+        if long_lines_count:
+            quality_issues.append(f"Lignes trop longues (>100 caractères): {long_lines_count} lignes")
         
         # Vérification des commentaires
-        comment_ratio = len(features['comments']) / max(features['lines_count'], 1)
+        comment_ratio = self._feature_count(features, 'comments') / max(features['lines_count'], 1)
         if comment_ratio < 0.1:
             quality_issues.append("Peu de commentaires détectés (< 10% des lignes)")
         
@@ -163,7 +380,9 @@ class AIEngine:
             quality_issues.append("Complexité élevée détectée - considérer la refactorisation")
         
         # Vérification des noms de variables courtes
-        short_vars = [var for var in features['variables'] if len(var) < 3 and var not in ['i', 'j', 'k', 'x', 'y', 'z']]
+        short_vars = features.get('short_variables')
+        if short_vars is None:
+            short_vars = [var for var in features['variables'] if self._is_short_variable(var)]
         if short_vars:
             quality_issues.append(f"Variables avec noms courts: {', '.join(short_vars[:5])}")
         
@@ -172,66 +391,195 @@ class AIEngine:
         
         return quality_issues
     
+    @synchronized
     def get_recommendations(self, features: Dict[str, Any]) -> List[str]:
-        """Génère des recommandations basées sur la base de connaissances"""
-        recommendations = []
+        """Retourne les recommandations précalculées du langage (calculées à la première lecture)"""
         language = features['language']
+        if language not in self.knowledge_base:
+            return []
         
-        if language in self.knowledge_base:
-            lang_knowledge = self.knowledge_base[language]
-            
-            # Recommandations basées sur les patterns appris
-            if 'common_patterns' in lang_knowledge:
-                recommendations.append(f"Patterns courants en {language}: {', '.join(lang_knowledge['common_patterns'][:3])}")
-            
-            if 'best_practices' in lang_knowledge:
-                recommendations.extend(lang_knowledge['best_practices'][:2])
+        lang_knowledge = self.knowledge_base[language]
+        if language in self.dirty_languages:
+            self.update_common_patterns(language)
         
-        return recommendations
+        return list(lang_knowledge['recommendations'])
     
-    def learn_from_code(self, code: str, file_path: str = ""):
-        """Apprend à partir du code analysé"""
-        features = self.extract_code_features(code)
-        language = features['language']
+    def learn_from_code(self, code: str, file_path: str = "") -> Dict[str, Any]:
+        """Apprend à partir du code analysé
         
-        if language not in self.knowledge_base:
-            self.knowledge_base[language] = {
-                'patterns': defaultdict(int),
-                'functions': set(),
-                'classes': set(),
-                'imports': set(),
-                'file_count': 0,
-                'total_lines': 0,
-                'common_patterns': [],
-                'best_practices': []
-            }
+        Retourne la contribution du fichier, utilisable par forget_contribution.
+        """
+        return self.learn_from_features(self.extract_code_features(code))
+    
+    @synchronized
+    def learn_from_features(self, features: Dict[str, Any], sampling_rate: float = 1.0) -> Dict[str, Any]:
+        """Apprend à partir de caractéristiques déjà extraites (voir extract_code_features)
         
-        kb = self.knowledge_base[language]
+        sampling_rate: fraction du corpus représentée par ce fichier lors d'un entraînement
+        par échantillonnage; les compteurs estimés sont pondérés par son inverse.
+        """
+        language = features['language']
+        
+        kb = self._language_entry(language)
+        weight = 1.0 / sampling_rate
         
         # Mise à jour des statistiques
         kb['file_count'] += 1
         kb['total_lines'] += features['lines_count']
+        kb['estimated_file_count'] += weight
+        kb['estimated_total_lines'] += features['lines_count'] * weight
+        
+        contribution = {'language': language, 'lines_count': features['lines_count'], 'weight': weight}
         
         # Apprentissage des patterns
-        for func in features['functions']:
-            kb['functions'].add(func)
+        for key in self.SYMBOL_KEYS:
+            symbol_ids = np.fromiter((self.symbol_pool.intern(symbol) for symbol in features[key]),
+                                     dtype=np.uint32, count=len(features[key]))
+            kb[key].add_ids(symbol_ids)
+            # Chaînes plutôt qu'identifiants: ceux-ci changent quand le pool est compacté
+            contribution[key] = list(features[key])
         
-        for cls in features['classes']:
-            kb['classes'].add(cls)
+        # Patterns courants recalculés plus tard, une seule fois (voir materialize_recommendations)
+        self.mark_language_dirty(language)
         
-        for imp in features['imports']:
-            kb['imports'].add(imp)
+        return contribution
+    
+    @synchronized
+    def forget_contribution(self, contribution: Dict[str, Any]):
+        """Retire de la base la contribution d'un fichier (supprimé ou modifié)
+        
+        Seules les contributions à chaînes de symboles (voir learn_from_features) sont acceptées:
+        des identifiants enregistrés avant un compactage du pool désigneraient d'autres symboles.
+        """
+        for key in self.SYMBOL_KEYS:
+            if isinstance(contribution[key], np.ndarray):
+                raise ValueError("Contribution à identifiants de symboles non supportée: "
+                                 "réentraînez le dossier pour la remplacer")
+        
+        language = contribution['language']
+        if language not in self.knowledge_base:
+            return
         
-        # Mise à jour des patterns courants
-        self.update_common_patterns(language)
+        kb = self.knowledge_base[language]
+        kb['file_count'] = max(kb['file_count'] - 1, 0)
+        kb['total_lines'] = max(kb['total_lines'] - contribution['lines_count'], 0)
+        weight = contribution.get('weight', 1.0)
+        kb['estimated_file_count'] = max(kb['estimated_file_count'] - weight, 0.0)
+        kb['estimated_total_lines'] = max(kb['estimated_total_lines'] - contribution['lines_count'] * weight, 0.0)
+        for key in self.SYMBOL_KEYS:
+            symbol_ids = (self.symbol_pool.lookup(symbol) for symbol in contribution[key])
+            kb[key].subtract_ids(np.array([i for i in symbol_ids if i >= 0], dtype=np.uint32))
+        
+        self.mark_language_dirty(language)
+    
+    def _language_entry(self, language: str) -> Dict[str, Any]:
+        """Retourne l'entrée d'un langage, en la créant au besoin"""
+        if language not in self.knowledge_base:
+            self.knowledge_base[language] = {
+                'patterns': defaultdict(int),
+                'functions': SymbolSet(self.symbol_pool),
+                'classes': SymbolSet(self.symbol_pool),
+                'imports': SymbolSet(self.symbol_pool),
+                'file_count': 0,
+                'total_lines': 0,
+                'estimated_file_count': 0.0,
+                'estimated_total_lines': 0.0,
+                'common_patterns': [],
+                'best_practices': [],
+                'recommendations': []
+            }
+        return self.knowledge_base[language]
+    
+    @synchronized
+    def merge_knowledge_base(self, other: 'AIEngine'):
+        """Fusionne la base de connaissances d'un autre moteur (compteurs et symboles)"""
+        remap = self.symbol_pool.merge(other.symbol_pool)
+        
+        for language, other_kb in other.knowledge_base.items():
+            kb = self._language_entry(language)
+            kb['file_count'] += other_kb.get('file_count', 0)
+            kb['total_lines'] += other_kb.get('total_lines', 0)
+            kb['estimated_file_count'] += other_kb.get('estimated_file_count', other_kb.get('file_count', 0))
+            kb['estimated_total_lines'] += other_kb.get('estimated_total_lines', other_kb.get('total_lines', 0))
+            
+            for pattern, count in other_kb.get('patterns', {}).items():
+                kb['patterns'][pattern] += count
+            
+            for key in self.SYMBOL_KEYS:
+                if key in other_kb:
+                    kb[key].merge(other_kb[key], remap)
+            
+            self.mark_language_dirty(language)
     
+    @synchronized
+    def mark_language_dirty(self, language: str):
+        """Signale une modification des symboles d'un langage (données dérivées à recalculer)"""
+        self.dirty_languages.add(language)
+        self._stale_completions.add(language)
+    
+    def complete_symbol(self, prefix: str, language: Optional[str] = None, k: int = 10) -> List[Tuple[str, int]]:
+        """Symboles appris (fonctions, classes, imports) commençant par prefix, les plus fréquents d'abord
+        
+        language: restreindre à un langage; None pour toutes les langues de la base.
+        Lit seulement l'index courant, sans verrou ni calcul sur les symboles (appelable à
+        chaque frappe): vide avant le premier rebuild_completion_indexes.
+        """
+        index = self._completion_indexes.get(language)
+        return index.complete(prefix, k) if index is not None else []
+    
+    def rebuild_completion_indexes(self):
+        """Reconstruit les index de complétion des langages modifiés, puis les remplace d'un bloc
+        
+        Seule la capture des tableaux de symboles (compactés, puis remplacés et jamais modifiés
+        sur place) se fait sous le verrou du moteur; les index sont construits en dehors, pendant
+        que complete_symbol sert encore les anciens. Les chaînes sont lues dans le pool capturé
+        en même temps: un pool n'est modifié que par ajout, et le compactage en crée un nouveau.
+        """
+        with self._completion_rebuild_lock:
+            with self.lock:
+                previous = self._completion_indexes
+                stale = self._stale_completions
+                self._stale_completions = set()
+                languages = [language for language in self.knowledge_base
+                             if language in stale or language not in previous]
+                if languages or None not in previous:
+                    languages = list(self.knowledge_base)
+                snapshots = {
+                    language: [self.knowledge_base[language][key].to_state()
+                               for key in self.SYMBOL_KEYS if key in self.knowledge_base[language]]
+                    for language in languages
+                }
+                pool = self.symbol_pool
+                known_languages = list(self.knowledge_base)
+            
+            indexes = {language: previous[language] for language in known_languages
+                       if language in previous and language not in stale}
+            for language, states in snapshots.items():
+                if language not in indexes:
+                    indexes[language] = PrefixIndex.from_states(pool, states)
+            if snapshots or None not in previous:
+                indexes[None] = PrefixIndex.from_states(pool, [state for states in snapshots.values()
+                                                               for state in states])
+            else:
+                indexes[None] = previous[None]
+            self._completion_indexes = indexes
+    
+    @synchronized
+    def materialize_recommendations(self):
+        """Recalcule les données dérivées des langages modifiés depuis le dernier calcul"""
+        for language in list(self.dirty_languages):
+            self.update_common_patterns(language)
+        self.dirty_languages.clear()
+    
+    @synchronized
     def update_common_patterns(self, language: str):
-        """Met à jour les patterns courants pour un langage"""
+        """Met à jour les patterns courants et les recommandations pour un langage"""
+        self.dirty_languages.discard(language)
         if language in self.knowledge_base:
             kb = self.knowledge_base[language]
             
             # Les fonctions les plus communes
-            common_functions = list(kb['functions'])[:10]
+            common_functions = [name for name, _ in kb['functions'].most_common(10)]
             kb['common_patterns'] = common_functions
             
             # Bonnes pratiques basiques
@@ -240,43 +588,140 @@ class AIEngine:
                 f"Organisez votre code avec des classes appropriées",
                 f"Documentez vos fonctions importantes"
             ]
+            
+            # Recommandations servies telles quelles par get_recommendations
+            kb['recommendations'] = [
+                f"Patterns courants en {language}: {', '.join(common_functions[:3])}",
+                *kb['best_practices'][:2]
+            ]
+    
+    @synchronized
+    def compact_symbol_pool(self):
+        """Reconstruit le pool avec les seuls symboles encore présents dans la base
+        
+        truncate() et la fusion de bases laissent dans le pool des chaînes qui ne sont plus
+        référencées; elles seraient sinon gardées en mémoire et sauvegardées indéfiniment.
+        """
+        symbol_sets = [kb[key] for kb in self.knowledge_base.values() for key in self.SYMBOL_KEYS if key in kb]
+        live_ids = np.unique(np.concatenate([symbol_set.to_state()['ids'] for symbol_set in symbol_sets]
+                                            or [np.zeros(0, dtype=np.uint32)]))
+        if len(live_ids) == len(self.symbol_pool):
+            return
+        
+        pool, remap = self.symbol_pool.subset(live_ids)
+        for symbol_set in symbol_sets:
+            symbol_set.rebase(pool, remap)
+        self.symbol_pool = pool
+    
+    @synchronized
+    def get_knowledge_base_state(self) -> Dict[str, Any]:
+        """État sérialisable de la base de connaissances"""
+        self.materialize_recommendations()
+        self.compact_symbol_pool()
+        
+        # Les symboles sont sérialisés sous forme de tableaux d'identifiants du pool
+        serializable_kb = {}
+        for lang, data in self.knowledge_base.items():
+            serializable_kb[lang] = {}
+            for key, value in data.items():
+                if isinstance(value, SymbolSet):
+                    serializable_kb[lang][key] = value.to_state()
+                elif isinstance(value, defaultdict):
+                    serializable_kb[lang][key] = dict(value)
+                else:
+                    serializable_kb[lang][key] = value
+        
+        return {
+            'format_version': self.KNOWLEDGE_BASE_FORMAT,
+            'knowledge_base_id': self.knowledge_base_id,
+            'symbol_pool': self.symbol_pool.__getstate__(),
+            'languages': serializable_kb
+        }
+    
+    @synchronized
+    def set_knowledge_base_state(self, loaded_kb: Dict[str, Any]):
+        """Remplace la base de connaissances par un état sérialisé (ancien ou nouveau format)"""
+        self.knowledge_base = defaultdict(dict)
+        self.symbol_pool = StringPool()
+        self.dirty_languages = set()
+        self._completion_indexes = {}
+        self._stale_completions = set()
+        
+        # Une base sans identifiant (ancien format) en reçoit un nouveau
+        self.knowledge_base_id = loaded_kb.get('knowledge_base_id') or uuid.uuid4().hex
+        
+        # Ancien format: {langage: {...}} avec des listes de symboles
+        compact = 'format_version' in loaded_kb
+        if compact:
+            if loaded_kb['format_version'] > self.KNOWLEDGE_BASE_FORMAT:
+                raise ValueError(f"Format de base de connaissances non supporté: {loaded_kb['format_version']}")
+            self.symbol_pool.__setstate__(loaded_kb['symbol_pool'])
+            loaded_kb = loaded_kb['languages']
+        
+        for lang, data in loaded_kb.items():
+            self.knowledge_base[lang] = {}
+            for key, value in data.items():
+                if key in self.SYMBOL_KEYS:
+                    if compact:
+                        self.knowledge_base[lang][key] = SymbolSet.from_state(self.symbol_pool, value)
+                    else:
+                        self.knowledge_base[lang][key] = SymbolSet(self.symbol_pool, value)
+                elif key == 'patterns':
+                    self.knowledge_base[lang][key] = defaultdict(int, value)
+                else:
+                    self.knowledge_base[lang][key] = value
+            
+            # Bases antérieures aux recommandations précalculées et aux compteurs estimés
+            if 'recommendations' not in data:
+                self.dirty_languages.add(lang)
+            self.knowledge_base[lang].setdefault('estimated_file_count', float(data.get('file_count', 0)))
+            self.knowledge_base[lang].setdefault('estimated_total_lines', float(data.get('total_lines', 0)))
     
     def save_knowledge_base(self):
         """Sauvegarde la base de connaissances"""
+        if self.knowledge_base_path is None:
+            return
+        
         try:
-            # Conversion des sets en listes pour la sérialisation
-            serializable_kb = {}
-            for lang, data in self.knowledge_base.items():
-                serializable_kb[lang] = {}
-                for key, value in data.items():
-                    if isinstance(value, set):
-                        serializable_kb[lang][key] = list(value)
-                    elif isinstance(value, defaultdict):
-                        serializable_kb[lang][key] = dict(value)
-                    else:
-                        serializable_kb[lang][key] = value
-            
-            with open('knowledge_base.pkl', 'wb') as f:
-                pickle.dump(serializable_kb, f)
+            with open(self.knowledge_base_path, 'wb') as f:
+                pickle.dump(self.get_knowledge_base_state(), f, protocol=pickle.HIGHEST_PROTOCOL)
         except Exception as e:
             print(f"Erreur lors de la sauvegarde: {e}")
     
     def load_knowledge_base(self):
         """Charge la base de connaissances"""
         try:
-            if os.path.exists('knowledge_base.pkl'):
-                with open('knowledge_base.pkl', 'rb') as f:
-                    loaded_kb = pickle.load(f)
-                
-                # Reconversion des listes en sets
-                for lang, data in loaded_kb.items():
-                    self.knowledge_base[lang] = {}
-                    for key, value in data.items():
-                        if key in ['functions', 'classes', 'imports']:
-                            self.knowledge_base[lang][key] = set(value)
-                        elif key == 'patterns':
-                            self.knowledge_base[lang][key] = defaultdict(int, value)
-                        else:
-                            self.knowledge_base[lang][key] = value
+            if self.knowledge_base_path is not None and os.path.exists(self.knowledge_base_path):
+                with open(self.knowledge_base_path, 'rb') as f:
+                    self.set_knowledge_base_state(pickle.load(f))
         except Exception as e:
             print(f"Erreur lors du chargement: {e}")
+    
+    def train_language_classifier(self, codes: List[str], labels: List[str]):
+        """Ajoute des exemples étiquetés au classifieur statistique de langage et le sauvegarde
+        
+        Les comptes s'ajoutent à ceux des entraînements précédents: un entraînement incrémental
+        (quelques fichiers modifiés) ne remplace pas le modèle appris sur tout le corpus.
+        """
+        # Mise à jour sur une copie, remplacée d'un bloc: les détections en cours gardent l'ancien modèle
+        classifier = self.language_classifier
+        if classifier is None or not classifier.is_updatable:
+            classifier = LanguageClassifier()
+        else:
+            classifier = copy.deepcopy(classifier)
+        self.language_classifier = classifier.partial_fit(codes, labels)
+        if self.classifier_path is None:
+            return
+        
+        try:
+            self.language_classifier.save(self.classifier_path)
+        except Exception as e:
+            print(f"Erreur lors de la sauvegarde du classifieur: {e}")
+    
+    def load_language_classifier(self):
+        """Charge le classifieur statistique de langage s'il existe"""
+        try:
+            if self.classifier_path is not None and os.path.exists(self.classifier_path):
+                self.language_classifier = LanguageClassifier.load(self.classifier_path)
+        except Exception as e:
+            print(f"Erreur lors du chargement du classifieur: {e}")
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Serveur d'analyse local: garde un AIEngine chargé en mémoire et répond aux requêtes
+analyze / learn / stats via une socket Unix (JSON par ligne) ou HTTP sur localhost.
+"""
+
+import argparse
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Any, Dict
+
+from ai_engine import AIEngine
+
+DEFAULT_SOCKET_PATH = os.path.join(os.path.expanduser('~'), '.ai_desktop_app.sock')
+LOCAL_HOSTS = ('127.0.0.1', 'localhost')
+
+class ReadWriteLock:
+    """Verrou lecteurs/rédacteur: lectures concurrentes, écritures exclusives et prioritaires"""
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+
+    def acquire_read(self):
+        with self._condition:
+            while self._writer or self._waiting_writers:
+                self._condition.wait()
+            self._readers += 1
+
+    def release_read(self):
+        with self._condition:
+            self._readers -= 1
+            if not self._readers:
+                self._condition.notify_all()
+
+    def acquire_write(self):
+        with self._condition:
+            self._waiting_writers += 1
+            while self._writer or self._readers:
+                self._condition.wait()
+            self._waiting_writers -= 1
+            self._writer = True
+
+    def release_write(self):
+        with self._condition:
+            self._writer = False
+            self._condition.notify_all()
+
+
+class AnalysisService:
+    """Traite les requêtes sur un moteur partagé"""
+
+    def __init__(self, ai_engine: AIEngine, max_workers: int = 8):
+        self.ai_engine = ai_engine
+        self.lock = ReadWriteLock()
+        self.unsaved_changes = 0
+        # Le pool borne les requêtes traitées en parallèle, pas le nombre de connexions ouvertes
+        self._pool = ThreadPoolExecutor(max_workers=max_workers)
+        # Les analyses concurrentes ne font que lire les recommandations précalculées
+        self.ai_engine.materialize_recommendations()
+
+    def handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        command = request.get('command')
+        try:
+            if command == 'analyze':
+                return {'ok': True, 'report': self._read(self._analyze, request)}
+            if command == 'stats':
+                return {'ok': True, 'stats': self._read(self._stats)}
+            if command == 'learn':
+                return {'ok': True, 'learned': self._write(self._learn, request)}
+            if command == 'save':
+                self.save()
+                return {'ok': True}
+            return {'ok': False, 'error': f"Commande inconnue: {command}"}
+        except Exception as e:
+            return {'ok': False, 'error': str(e)}
+
+    def submit(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Traite une requête dans le pool et attend sa réponse"""
+        return self._pool.submit(self.handle, request).result()
+    
+    def close(self):
+        self._pool.shutdown(wait=True)
+    
+    def _read(self, function, *args):
+        self.lock.acquire_read()
+        try:
+            return function(*args)
+        finally:
+            self.lock.release_read()
+
+    def _write(self, function, *args):
+        self.lock.acquire_write()
+        try:
+            return function(*args)
+        finally:
+            self.lock.release_write()
+
+    def _analyze(self, request: Dict[str, Any]) -> str:
+        if 'path' in request:
+            return self.ai_engine.analyze_file(request['path'])
+        return self.ai_engine.analyze_code(request['code'])
+
+    def _learn(self, request: Dict[str, Any]) -> str:
+        code = request.get('code')
+        if code is None:
+            with open(request['path'], 'r', encoding='utf-8', errors='replace') as f:
+                code = f.read()
+        contribution = self.ai_engine.learn_from_code(code, request.get('path', ''))
+        # Les lecteurs ne doivent jamais déclencher de compaction ni de recalcul
+        for key in AIEngine.SYMBOL_KEYS:
+            self.ai_engine.knowledge_base[contribution['language']][key].compact()
+        self.ai_engine.materialize_recommendations()
+        self.unsaved_changes += 1
+        return contribution['language']
+
+    def _stats(self) -> Dict[str, Any]:
+        return {
+            language: {
+                'file_count': kb.get('file_count', 0),
+                'total_lines': kb.get('total_lines', 0),
+                **{key: len(kb[key]) for key in AIEngine.SYMBOL_KEYS if key in kb}
+            }
+            for language, kb in self.ai_engine.knowledge_base.items()
+        }
+
+    def save(self):
+        """Sauvegarde la base si des apprentissages sont en attente"""
+        # Verrou exclusif: la sérialisation compacte les ensembles de symboles
+        self.lock.acquire_write()
+        try:
+            if self.unsaved_changes:
+                self.ai_engine.save_knowledge_base()
+                self.unsaved_changes = 0
+        finally:
+            self.lock.release_write()
+
+
+class UnixAnalysisServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Un thread léger par connexion (lecture des lignes); le travail passe par le pool du service"""
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, service: AnalysisService):
+        self.service = service
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        super().__init__(socket_path, UnixRequestHandler)
+        os.chmod(socket_path, 0o600)
+
+
+class UnixRequestHandler(socketserver.StreamRequestHandler):
+    """Une requête JSON par ligne, une réponse JSON par ligne"""
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                response = self.server.service.submit(json.loads(line))
+            except ValueError as e:
+                response = {'ok': False, 'error': f"JSON invalide: {e}"}
+            self.wfile.write(json.dumps(response).encode('utf-8') + b'\n')
+            self.wfile.flush()
+
+
+class HTTPAnalysisServer(socketserver.ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port: int, service: AnalysisService):
+        self.service = service
+        super().__init__(('127.0.0.1', port), HTTPRequestHandler)
+        self.allowed_hosts = {f'{host}:{self.server_address[1]}' for host in LOCAL_HOSTS} | set(LOCAL_HOSTS)
+
+
+class HTTPRequestHandler(BaseHTTPRequestHandler):
+    """POST /analyze, /learn, /save avec un corps JSON; GET /stats
+
+    Seuls les clients locaux non-navigateurs sont acceptés: un en-tête Host étranger
+    (rebinding DNS) ou une requête d'une autre origine (page web) est refusé, et un POST
+    doit être en application/json, ce qu'un formulaire ne peut pas envoyer sans pré-vol.
+    """
+
+    def _forbidden_reason(self, post: bool) -> str:
+        if self.headers.get('Host', '').lower() not in self.server.allowed_hosts:
+            return "Hôte non autorisé"
+        origin = self.headers.get('Origin')
+        if origin is not None and origin.lower() not in {f'http://{host}' for host in self.server.allowed_hosts}:
+            return "Origine non autorisée"
+        if self.headers.get('Sec-Fetch-Site', 'none') not in ('none', 'same-origin'):
+            return "Requête inter-sites refusée"
+        content_type = self.headers.get('Content-Type', '').split(';')[0].strip().lower()
+        if post and content_type != 'application/json':
+            return "Content-Type application/json requis"
+        return ''
+
+    def _respond(self, response: Dict[str, Any], status: int = None):
+        body = json.dumps(response).encode('utf-8')
+        self.send_response(status or (200 if response.get('ok') else 400))
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        reason = self._forbidden_reason(post=False)
+        if reason:
+            self._respond({'ok': False, 'error': reason}, 403)
+            return
+        self._respond(self.server.service.submit({'command': self.path.strip('/')}))
+
+    def do_POST(self):
+        reason = self._forbidden_reason(post=True)
+        if reason:
+            self._respond({'ok': False, 'error': reason}, 403)
+            return
+        length = int(self.headers.get('Content-Length', 0))
+        try:
+            request = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError as e:
+            self._respond({'ok': False, 'error': f"JSON invalide: {e}"})
+            return
+        request['command'] = self.path.strip('/')
+        self._respond(self.server.service.submit(request))
+
+    def log_message(self, format, *args):
+        pass
+
+
+def send_request(request: Dict[str, Any], socket_path: str = DEFAULT_SOCKET_PATH) -> Dict[str, Any]:
+    """Envoie une requête au serveur via la socket Unix et retourne la réponse"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(socket_path)
+        stream = client.makefile('rwb')
+        stream.write(json.dumps(request).encode('utf-8') + b'\n')
+        stream.flush()
+        return json.loads(stream.readline())
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serveur d'analyse local")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    serve_parser = commands.add_parser('serve', help="Démarrer le serveur")
+    serve_parser.add_argument('--socket', default=DEFAULT_SOCKET_PATH)
+    serve_parser.add_argument('--port', type=int, help="Servir en HTTP sur 127.0.0.1 au lieu de la socket Unix")
+    serve_parser.add_argument('--workers', type=int, default=8)
+    serve_parser.add_argument('--knowledge-base', default='knowledge_base.pkl')
+
+    analyze_parser = commands.add_parser('analyze', help="Analyser un fichier via le serveur")
+    analyze_parser.add_argument('file')
+    analyze_parser.add_argument('--socket', default=DEFAULT_SOCKET_PATH)
+
+    stats_parser = commands.add_parser('stats', help="Statistiques de la base chargée")
+    stats_parser.add_argument('--socket', default=DEFAULT_SOCKET_PATH)
+
+    args = parser.parse_args(argv)
+
+    if args.command != 'serve':
+        request = {'command': 'stats'}
+        if args.command == 'analyze':
+            request = {'command': 'analyze', 'path': os.path.abspath(args.file)}
+        try:
+            response = send_request(request, args.socket)
+        except OSError as e:
+            print(f"❌ Serveur injoignable: {e}")
+            return 1
+        if not response['ok']:
+            print(f"❌ Erreur: {response['error']}")
+            return 1
+        print(response['report'] if args.command == 'analyze' else json.dumps(response['stats'], indent=2))
+        return 0
+
+    service = AnalysisService(AIEngine(knowledge_base_path=args.knowledge_base), args.workers)
+    if args.port:
+        server = HTTPAnalysisServer(args.port, service)
+        print(f"🚀 Serveur d'analyse sur http://127.0.0.1:{args.port}")
+    else:
+        server = UnixAnalysisServer(args.socket, service)
+        print(f"🚀 Serveur d'analyse sur {args.socket}")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+        service.save()
+        if not args.port and os.path.exists(args.socket):
+            os.remove(args.socket)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
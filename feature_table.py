@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Table colonnaire des caractéristiques par fichier: une colonne numérique de largeur
+fixe par fichier binaire (mappable en mémoire avec numpy), plus un manifeste JSON
+contenant les types, le nombre de lignes et les dictionnaires de chaînes.
+"""
+
+import json
+import os
+import sys
+from array import array
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+FEATURE_TABLE_VERSION = 2
+MANIFEST_NAME = 'manifest.json'
+# Colonnes renommées depuis une version antérieure: nom actuel -> nom dans la table
+RENAMED_COLUMNS = {1: {'analyzed_lines': 'lines_count'}}
+
+# Colonne -> code de type du module array (la table est écrite en ordre d'octets natif)
+COLUMNS = {
+    'size': 'q',
+    'line_count': 'i',       # lignes du fichier lu
+    'analyzed_lines': 'i',   # lignes vues par l'analyse (0 si non analysé)
+    'complexity': 'i',
+    'functions': 'i',
+    'classes': 'i',
+    'imports': 'i',
+    'variables': 'i',
+    'comments': 'i',
+    'language_id': 'h',
+    'file_language_id': 'h',
+    'extension_id': 'i',
+    'flag_id': 'B',
+    'status_id': 'B',
+    'is_code': 'B',
+    'language_confidence': 'f',
+    'sampling_rate': 'f',
+    'path_end': 'q'
+}
+FEATURE_COUNT_KEYS = ('functions', 'classes', 'imports', 'variables', 'comments')
+STATUSES = ['ok', 'degraded', 'skipped', 'not_code', 'flagged']
+
+class FeatureTableWriter:
+    """Écrit la table par blocs de lignes, sans garder les enregistrements en mémoire"""
+
+    def __init__(self, table_path: str, chunk_rows: int = 65536):
+        self.table_path = table_path
+        self.chunk_rows = chunk_rows
+        self.rows = 0
+        # Chaînes -> identifiants; l'identifiant 0 est la chaîne vide (valeur absente)
+        self.dictionaries = {'languages': {'': 0}, 'extensions': {'': 0}, 'flags': {'': 0}}
+        self._buffers = {name: array(code) for name, code in COLUMNS.items()}
+        self._path_bytes = bytearray()
+        self._path_offset = 0
+
+        os.makedirs(table_path, exist_ok=True)
+        # Une table par entraînement: les colonnes précédentes sont remplacées
+        self._files = {name: open(os.path.join(table_path, f'{name}.bin'), 'wb') for name in COLUMNS}
+        self._paths_file = open(os.path.join(table_path, 'paths.bin'), 'wb')
+
+    def _string_id(self, dictionary: str, value: Optional[str]) -> int:
+        ids = self.dictionaries[dictionary]
+        value = value or ''
+        if value not in ids:
+            ids[value] = len(ids)
+        return ids[value]
+
+    def append(self, file_data: Dict[str, Any], features: Optional[Dict[str, Any]] = None, status: str = 'ok'):
+        """Ajoute la ligne d'un fichier; features est None pour un fichier non analysé"""
+        buffers = self._buffers
+        buffers['size'].append(file_data.get('size', 0))
+        buffers['line_count'].append(file_data.get('line_count', 0))
+        buffers['file_language_id'].append(self._string_id('languages', file_data.get('language')))
+        buffers['extension_id'].append(self._string_id('extensions', file_data.get('extension')))
+        buffers['flag_id'].append(self._string_id('flags', file_data.get('content_flag')))
+        buffers['status_id'].append(STATUSES.index(status))
+        buffers['is_code'].append(bool(file_data.get('is_code')))
+        buffers['sampling_rate'].append(file_data.get('sampling_rate', 1.0))
+
+        if features is None:
+            features = {}
+        buffers['analyzed_lines'].append(features.get('lines_count', 0))
+        buffers['complexity'].append(features.get('complexity_score', 0))
+        for key in FEATURE_COUNT_KEYS:
+            buffers[key].append(len(features.get(key, ())))
+        buffers['language_id'].append(self._string_id('languages', features.get('language')))
+        buffers['language_confidence'].append(features.get('language_confidence', 0.0))
+
+        path = file_data.get('path', '').encode('utf-8', errors='surrogateescape')
+        self._path_bytes += path
+        self._path_offset += len(path)
+        buffers['path_end'].append(self._path_offset)
+
+        self.rows += 1
+        if len(buffers['size']) >= self.chunk_rows:
+            self.flush()
+
+    def flush(self):
+        for name, buffer in self._buffers.items():
+            buffer.tofile(self._files[name])
+            self._buffers[name] = array(COLUMNS[name])
+        self._paths_file.write(self._path_bytes)
+        self._path_bytes = bytearray()
+
+    def close(self):
+        """Écrit les derniers blocs puis le manifeste (la table n'est lisible qu'après)"""
+        self.flush()
+        for f in self._files.values():
+            f.close()
+        self._paths_file.close()
+
+        manifest = {
+            'version': FEATURE_TABLE_VERSION,
+            'rows': self.rows,
+            'columns': {name: np.dtype(code).str for name, code in COLUMNS.items()},
+            'statuses': STATUSES,
+            'dictionaries': {name: sorted(ids, key=ids.get) for name, ids in self.dictionaries.items()}
+        }
+        with open(os.path.join(self.table_path, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    def __enter__(self) -> 'FeatureTableWriter':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class FeatureTable:
+    """Lecture d'une table: chaque colonne est un tableau numpy mappé en mémoire"""
+
+    def __init__(self, table_path: str):
+        self.table_path = table_path
+        with open(os.path.join(table_path, MANIFEST_NAME), 'r', encoding='utf-8') as f:
+            self.manifest = json.load(f)
+        if self.manifest['version'] > FEATURE_TABLE_VERSION:
+            raise ValueError(f"Version de table non supportée: {self.manifest['version']}")
+
+        self.rows = self.manifest['rows']
+        self.dictionaries = self.manifest['dictionaries']
+        self.statuses = self.manifest['statuses']
+        self._renamed = RENAMED_COLUMNS.get(self.manifest['version'], {})
+        self._columns = {}
+
+    def __len__(self) -> int:
+        return self.rows
+
+    @property
+    def column_names(self) -> List[str]:
+        stored_names = {stored: name for name, stored in self._renamed.items()}
+        return [stored_names.get(name, name) for name in self.manifest['columns']]
+
+    def column(self, name: str) -> np.ndarray:
+        if name not in self._columns:
+            stored = self._renamed.get(name, name)
+            dtype = np.dtype(self.manifest['columns'][stored])
+            if self.rows == 0:
+                self._columns[name] = np.zeros(0, dtype=dtype)
+            else:
+                self._columns[name] = np.memmap(os.path.join(self.table_path, f'{stored}.bin'),
+                                                dtype=dtype, mode='r', shape=(self.rows,))
+        return self._columns[name]
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.column(name)
+
+    def path(self, row: int) -> str:
+        path_end = self.column('path_end')
+        start = int(path_end[row - 1]) if row > 0 else 0
+        with open(os.path.join(self.table_path, 'paths.bin'), 'rb') as f:
+            f.seek(start)
+            return f.read(int(path_end[row]) - start).decode('utf-8', errors='surrogateescape')
+
+    def decode(self, dictionary: str, ids: np.ndarray) -> List[str]:
+        """Traduit une colonne d'identifiants en chaînes"""
+        values = self.dictionaries[dictionary]
+        return [values[int(i)] for i in ids]
+
+    def language_breakdown(self, column: str = 'language_id') -> Dict[str, int]:
+        """Nombre de fichiers par langage (détecté par défaut, 'file_language_id' pour l'extension)"""
+        counts = np.bincount(self.column(column), minlength=len(self.dictionaries['languages']))
+        return {language or 'inconnu': int(count)
+                for language, count in zip(self.dictionaries['languages'], counts) if count}
+
+    def complexity_percentiles(self, percentiles=(50, 90, 99)) -> Dict[str, Dict[int, float]]:
+        """Percentiles de complexité par langage détecté, sur les fichiers analysés"""
+        analyzed = np.isin(self.column('status_id'), [self.statuses.index('ok'), self.statuses.index('degraded')])
+        language_ids = self.column('language_id')[analyzed]
+        complexity = self.column('complexity')[analyzed]
+        result = {}
+        for language_id in np.unique(language_ids):
+            values = complexity[language_ids == language_id]
+            result[self.dictionaries['languages'][language_id] or 'inconnu'] = {
+                p: float(v) for p, v in zip(percentiles, np.percentile(values, percentiles))
+            }
+        return result
+
+def main():
+    if len(sys.argv) != 2:
+        print("Usage: python feature_table.py <dossier de la table>")
+        return 1
+
+    table = FeatureTable(sys.argv[1])
+    print(f"📊 {len(table)} fichiers, {int(table['size'].sum())} octets, "
+          f"{int(table['line_count'].sum())} lignes")
+    print("Langages détectés:")
+    for language, count in sorted(table.language_breakdown().items(), key=lambda item: -item[1]):
+        print(f"  {language}: {count}")
+    print("Complexité (p50 / p90 / p99):")
+    for language, values in sorted(table.complexity_percentiles().items()):
+        print(f"  {language}: {values[50]:.0f} / {values[90]:.0f} / {values[99]:.0f}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
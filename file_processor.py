@@ -1,7 +1,18 @@
 import os
+import io
+import re
+import bz2
+import gzip
+import lzma
+import heapq
+import tarfile
+import zipfile
+import itertools
 import mimetypes
+import threading
 from pathlib import Path
-from typing import List, Dict, Callable, Any
+from collections import Counter
+from typing import List, Dict, Callable, Any, Iterator, BinaryIO, Optional
 import chardet
 
 class FileProcessor:
@@ -37,8 +48,52 @@ class FileProcessor:
             '.mp3', '.mp4', '.avi', '.mov', '.wav', '.pdf',
             '.zip', '.rar', '.tar', '.gz', '.7z'
         }
+        
+        # Archives lues en flux (sans extraction sur disque), y compris imbriquées
+        self.process_archives = True
+        self.archive_suffixes = (
+            '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz',
+            '.tar', '.zip', '.jar', '.gz', '.bz2', '.xz'
+        )
+        self.max_archive_depth = 3
+        self.max_member_size = 50 * 1024 * 1024
+        
+        # Fichiers minifiés, générés ou de verrouillage: détectés sur un échantillon initial
+        # 'skip' les ignore avant lecture complète, 'tag' les garde (statistiques) sans apprentissage
+        self.generated_policy = 'skip'
+        self.content_sample_size = 8192
+        self.skipped_counts = Counter()
+        self.lockfile_names = {
+            'package-lock.json', 'npm-shrinkwrap.json', 'yarn.lock', 'pnpm-lock.yaml',
+            'cargo.lock', 'poetry.lock', 'pipfile.lock', 'gemfile.lock', 'composer.lock',
+            'go.sum', 'mix.lock', 'packages.lock.json', 'flake.lock', 'pubspec.lock'
+        }
+        self.generated_suffixes = (
+            '_pb2.py', '_pb2_grpc.py', '.pb.go', '.pb.cc', '.pb.h', '.pb.swift',
+            '.g.dart', '.freezed.dart', '.designer.cs', '.generated.cs', '.generated.ts'
+        )
+        self.minified_suffixes = ('.min.js', '.min.css', '.min.mjs', '-min.js')
+        # Heuristique de minification, limitée aux formats servis minifiés: une part importante
+        # de lignes longues, ou très peu de retours à la ligne sur un échantillon conséquent
+        self.minifiable_extensions = {'.js', '.mjs', '.cjs', '.css', '.json'}
+        self.minified_line_length = 500
+        self.minified_long_line_share = 0.25
+        self.minified_newline_density = 0.002
+        self.minified_min_sample = 1024
+        # En-têtes posés par les générateurs, cherchés uniquement dans les commentaires de tête
+        self.generated_header_patterns = [re.compile(pattern) for pattern in (
+            r'^Code generated .* DO NOT EDIT\.$',                                   # convention Go
+            r'@generated\b',                                                        # Buck, Hack, Relay...
+            r'^Generated by the protocol buffer compiler\.\s+DO NOT EDIT\b',           # protoc
+            r'^<auto-generated\b',                                                  # outils .NET
+            r'^Autogenerated by Thrift Compiler\b',
+            r'(?i)^(this (file|code) (is|was|has been) )?(automatically |auto-?)generated\b.*\bdo not (edit|modify)\b'
+        )]
+        self.header_comment_prefixes = ('#!', '//', '#', '/*', '*/', '*', '--', ';', '<!--', '"""', "'''", '%')
+        self.header_lines = 10
     
-    def process_directory(self, directory_path: str, progress_callback: Callable[[float], None] = None) -> List[Dict[str, Any]]:
+    def process_directory(self, directory_path: str, progress_callback: Callable[[float], None] = None,
+                          stats: 'FileStatsAccumulator' = None) -> List[Dict[str, Any]]:
         """Traite récursivement tous les fichiers d'un répertoire"""
         files_data = []
         all_files = list(Path(directory_path).rglob('*'))
@@ -46,12 +101,21 @@ class FileProcessor:
         
         processed_files = 0
         
+        skipped_before = Counter(self.skipped_counts)
+        
         for file_path in all_files:
             if file_path.is_file():
                 try:
-                    file_data = self.process_file(str(file_path))
-                    if file_data:
-                        files_data.append(file_data)
+                    if self.process_archives and self.is_archive(file_path.name):
+                        records = self.process_archive(str(file_path))
+                    else:
+                        records = [self.process_file(str(file_path))]
+                    
+                    for file_data in records:
+                        if file_data:
+                            files_data.append(file_data)
+                            if stats is not None:
+                                stats.add(file_data)
                     
                     processed_files += 1
                     if progress_callback and total_files > 0:
@@ -62,6 +126,10 @@ class FileProcessor:
                     print(f"Erreur lors du traitement de {file_path}: {e}")
                     continue
         
+        if stats is not None:
+            for reason, count in (self.skipped_counts - skipped_before).items():
+                stats.add_skipped(reason, count)
+        
         return files_data
     
     def process_file(self, file_path: str) -> Dict[str, Any]:
@@ -80,28 +148,185 @@ class FileProcessor:
                 return None
         
         try:
+            with open(file_path, 'rb') as f:
+                content_flag = self.classify_content(path_obj.name, f.read(self.content_sample_size))
+            if content_flag and self.generated_policy == 'skip':
+                self.skipped_counts[content_flag] += 1
+                return None
+            
             content = self.read_file_content(file_path)
             if content is None:
                 return None
             
-            file_data = {
-                'path': file_path,
-                'name': path_obj.name,
-                'extension': extension,
-                'size': path_obj.stat().st_size,
-                'content': content,
-                'encoding': self.detect_encoding(file_path),
-                'line_count': len(content.split('\n')),
-                'is_code': self.is_code_file(extension, content),
-                'language': self.detect_file_language(extension, path_obj.name, content)
-            }
-            
+            file_data = self._build_file_data(file_path, path_obj.name, extension, path_obj.stat().st_size,
+                                              content, self.detect_encoding(file_path))
+            file_data['content_flag'] = content_flag
             return file_data
             
         except Exception as e:
             print(f"Erreur lors de la lecture de {file_path}: {e}")
             return None
     
+    def _build_file_data(self, path: str, name: str, extension: str, size: int,
+                         content: str, encoding: str) -> Dict[str, Any]:
+        """Construit l'enregistrement d'un fichier à partir de son contenu décodé"""
+        return {
+            'path': path,
+            'name': name,
+            'extension': extension,
+            'size': size,
+            'content': content,
+            'encoding': encoding,
+            'line_count': len(content.split('\n')),
+            'is_code': self.is_code_file(extension, content),
+            'language': self.detect_file_language(extension, name, content)
+        }
+    
+    def process_bytes(self, path: str, name: str, raw_data: bytes) -> Dict[str, Any]:
+        """Traite un contenu déjà en mémoire (membre d'archive) comme process_file"""
+        extension = Path(name).suffix.lower()
+        
+        if extension in self.binary_extensions:
+            return None
+        
+        if extension not in self.supported_extensions and extension != '':
+            if not self.is_text_data(raw_data[:1024], name):
+                return None
+        
+        content_flag = self.classify_content(name, raw_data[:self.content_sample_size])
+        if content_flag and self.generated_policy == 'skip':
+            self.skipped_counts[content_flag] += 1
+            return None
+        
+        content = self.decode_content(raw_data)
+        if content is None:
+            return None
+        
+        encoding = chardet.detect(raw_data[:10000])['encoding'] or 'utf-8'
+        file_data = self._build_file_data(path, name, extension, len(raw_data), content, encoding)
+        file_data['content_flag'] = content_flag
+        return file_data
+    
+    def has_generated_header(self, text: str) -> bool:
+        """Cherche un en-tête de générateur dans les premières lignes de commentaire du fichier
+        
+        La lecture s'arrête à la première ligne de code: une mention « do not edit » écrite à
+        la main plus loin, ou hors d'un en-tête reconnu, ne suffit pas.
+        """
+        for line in text.split('\n', self.header_lines)[:self.header_lines]:
+            line = line.strip()
+            if not line:
+                continue
+            prefix = next((p for p in self.header_comment_prefixes if line.startswith(p)), None)
+            if prefix is None:
+                return False
+            comment = line[len(prefix):].strip(' */-#!').strip()
+            if any(pattern.search(comment) for pattern in self.generated_header_patterns):
+                return True
+        return False
+    
+    def classify_content(self, name: str, sample: bytes) -> Optional[str]:
+        """Repère les fichiers sans intérêt pour l'apprentissage à partir d'un échantillon initial
+        
+        Retourne 'lockfile', 'sourcemap', 'generated', 'minified' ou None.
+        """
+        name_lower = name.lower()
+        if name_lower in self.lockfile_names:
+            return 'lockfile'
+        if name_lower.endswith('.map'):
+            return 'sourcemap'
+        if name_lower.endswith(self.generated_suffixes):
+            return 'generated'
+        if name_lower.endswith(self.minified_suffixes):
+            return 'minified'
+        
+        if not sample:
+            return None
+        
+        text = sample.decode('utf-8', errors='ignore')
+        if self.has_generated_header(text):
+            return 'generated'
+        header = text[:2048].lower()
+        if header.lstrip().startswith('{"version":3,') and '"mappings"' in text:
+            return 'sourcemap'
+        
+        # Minification: une seule longue ligne (chaîne embarquée, page HTML, script) ne suffit pas
+        if os.path.splitext(name_lower)[1] not in self.minifiable_extensions:
+            return None
+        if len(text) >= self.minified_min_sample and text.count('\n') < len(text) * self.minified_newline_density:
+            return 'minified'
+        lines = text.split('\n')
+        long_lines = sum(1 for line in lines if len(line) > self.minified_line_length)
+        if long_lines >= 2 and long_lines >= len(lines) * self.minified_long_line_share:
+            return 'minified'
+        
+        return None
+    
+    def is_archive(self, name: str) -> bool:
+        return name.lower().endswith(self.archive_suffixes)
+    
+    def process_archive(self, archive_path: str) -> Iterator[Dict[str, Any]]:
+        """Parcourt les membres d'une archive sur disque sans l'extraire"""
+        with open(archive_path, 'rb') as f:
+            yield from self._iter_archive(f, archive_path, os.path.basename(archive_path), 0)
+    
+    def _iter_archive(self, fileobj: BinaryIO, label: str, name: str, depth: int) -> Iterator[Dict[str, Any]]:
+        """Produit les enregistrements des membres; les chemins sont de la forme archive!membre"""
+        lower_name = name.lower()
+        
+        if lower_name.endswith(('.zip', '.jar')):
+            with zipfile.ZipFile(fileobj) as archive:
+                for info in archive.infolist():
+                    if info.is_dir() or info.file_size > self.max_member_size:
+                        continue
+                    with archive.open(info) as member:
+                        yield from self._process_member(member, f"{label}!{info.filename}", info.filename, depth)
+        
+        elif lower_name.endswith(('.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz')):
+            # Mode flux: les membres sont lus dans l'ordre, sans retour arrière
+            with tarfile.open(fileobj=fileobj, mode='r|*') as archive:
+                for info in archive:
+                    if not info.isfile() or info.size > self.max_member_size:
+                        continue
+                    member = archive.extractfile(info)
+                    if member is not None:
+                        yield from self._process_member(member, f"{label}!{info.name}", info.name, depth)
+        
+        else:
+            # Fichier unique compressé: fichier.py.gz -> fichier.py
+            suffix = os.path.splitext(lower_name)[1]
+            if suffix == '.gz':
+                decompressed = gzip.GzipFile(fileobj=fileobj)
+            else:
+                decompressed = {'.bz2': bz2.BZ2File, '.xz': lzma.LZMAFile}[suffix](fileobj)
+            with decompressed as member:
+                inner_name = name[:-len(suffix)]
+                yield from self._process_member(member, f"{label}!{os.path.basename(inner_name)}", inner_name, depth)
+    
+    def _process_member(self, member: BinaryIO, label: str, name: str, depth: int) -> Iterator[Dict[str, Any]]:
+        try:
+            if self.is_archive(name):
+                if depth + 1 >= self.max_archive_depth:
+                    return
+                if not name.lower().endswith(('.zip', '.jar')):
+                    yield from self._iter_archive(member, label, os.path.basename(name), depth + 1)
+                    return
+                
+                # Les zip imbriqués exigent un flux adressable: chargés en mémoire
+                nested = io.BytesIO(member.read(self.max_member_size + 1))
+                if len(nested.getbuffer()) <= self.max_member_size:
+                    yield from self._iter_archive(nested, label, os.path.basename(name), depth + 1)
+                return
+            
+            raw_data = member.read(self.max_member_size + 1)
+            if len(raw_data) <= self.max_member_size:
+                file_data = self.process_bytes(label, os.path.basename(name), raw_data)
+                if file_data:
+                    file_data['archive'] = label.split('!', 1)[0]
+                    yield file_data
+        except Exception as e:
+            print(f"Erreur lors de la lecture de {label}: {e}")
+    
     def read_file_content(self, file_path: str) -> str:
         """Lit le contenu d'un fichier avec détection d'encodage"""
         try:
@@ -126,6 +351,25 @@ class FileProcessor:
             except:
                 return None
     
+    def decode_content(self, raw_data: bytes) -> str:
+        """Décode des octets avec la même stratégie que read_file_content"""
+        try:
+            content = raw_data.decode('utf-8')
+        except UnicodeDecodeError:
+            content = None
+            try:
+                encoding = chardet.detect(raw_data)['encoding']
+                if encoding:
+                    content = raw_data.decode(encoding)
+            except:
+                pass
+            
+            if content is None:
+                content = raw_data.decode('latin-1')
+        
+        # Même normalisation des fins de ligne qu'une lecture en mode texte
+        return content.replace('\r\n', '\n').replace('\r', '\n')
+    
     def detect_encoding(self, file_path: str) -> str:
         """Détecte l'encodage d'un fichier"""
         try:
@@ -145,17 +389,25 @@ class FileProcessor:
             
             # Vérification par échantillonnage
             with open(file_path, 'rb') as f:
-                chunk = f.read(1024)
-                if b'\0' in chunk:  # Fichier binaire probable
-                    return False
-                
-                # Vérifier le ratio de caractères imprimables
-                printable_chars = sum(1 for byte in chunk if 32 <= byte <= 126 or byte in [9, 10, 13])
-                return printable_chars / len(chunk) > 0.7 if chunk else False
+                return self.is_text_data(f.read(1024))
                 
         except:
             return False
     
+    def is_text_data(self, chunk: bytes, name: str = None) -> bool:
+        """Vérifie si un échantillon d'octets ressemble à du texte"""
+        if name:
+            mime_type, _ = mimetypes.guess_type(name)
+            if mime_type and mime_type.startswith('text/'):
+                return True
+        
+        if b'\0' in chunk:  # Fichier binaire probable
+            return False
+        
+        # Vérifier le ratio de caractères imprimables
+        printable_chars = sum(1 for byte in chunk if 32 <= byte <= 126 or byte in [9, 10, 13])
+        return printable_chars / len(chunk) > 0.7 if chunk else False
+    
     def is_code_file(self, extension: str, content: str) -> bool:
         """Détermine si un fichier contient du code"""
         code_extensions = {
@@ -260,35 +512,135 @@ class FileProcessor:
     
     def get_file_stats(self, files_data: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Génère des statistiques sur les fichiers traités"""
-        if not files_data:
-            return {}
-        
-        stats = {
-            'total_files': len(files_data),
-            'total_size': sum(f['size'] for f in files_data),
-            'total_lines': sum(f['line_count'] for f in files_data),
-            'languages': {},
-            'extensions': {},
-            'code_files': sum(1 for f in files_data if f['is_code']),
-            'largest_file': max(files_data, key=lambda x: x['size']),
-            'most_lines': max(files_data, key=lambda x: x['line_count'])
-        }
-        
-        # Statistiques par langage
+        stats = FileStatsAccumulator()
         for file_data in files_data:
-            lang = file_data['language']
-            if lang not in stats['languages']:
-                stats['languages'][lang] = {'count': 0, 'lines': 0, 'size': 0}
+            stats.add(file_data)
+        return stats.get_stats()
+
+
+class FileStatsAccumulator:
+    """Statistiques de fichiers mises à jour au fil de l'ingestion, fusionnables entre workers"""
+    
+    def __init__(self, top_n: int = 10):
+        self.top_n = top_n
+        self.total_files = 0
+        self.total_size = 0
+        self.total_lines = 0
+        self.code_files = 0
+        self.code_lines = 0
+        self.languages = {}
+        self.extensions = {}
+        self.skipped = {}
+        self._largest = []  # tas min de (taille, ordre, résumé)
+        self._most_lines = None
+        self._order = itertools.count()
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _summary(file_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Copie du fichier sans son contenu, pour ne pas le garder en mémoire"""
+        return {key: value for key, value in file_data.items() if key != 'content'}
+    
+    def _push_largest(self, size: int, summary: Dict[str, Any]):
+        entry = (size, next(self._order), summary)
+        if len(self._largest) < self.top_n:
+            heapq.heappush(self._largest, entry)
+        elif size > self._largest[0][0]:
+            heapq.heapreplace(self._largest, entry)
+    
+    def add(self, file_data: Dict[str, Any]):
+        """Ajoute un fichier traité"""
+        with self._lock:
+            size = file_data['size']
+            line_count = file_data['line_count']
+            
+            self.total_files += 1
+            self.total_size += size
+            self.total_lines += line_count
+            if file_data['is_code']:
+                self.code_files += 1
+                self.code_lines += line_count
+            
+            lang_stats = self.languages.setdefault(file_data['language'], {'count': 0, 'lines': 0, 'size': 0})
+            lang_stats['count'] += 1
+            lang_stats['lines'] += line_count
+            lang_stats['size'] += size
             
-            stats['languages'][lang]['count'] += 1
-            stats['languages'][lang]['lines'] += file_data['line_count']
-            stats['languages'][lang]['size'] += file_data['size']
-        
-        # Statistiques par extension
-        for file_data in files_data:
             ext = file_data['extension'] or 'no_extension'
-            if ext not in stats['extensions']:
-                stats['extensions'][ext] = 0
-            stats['extensions'][ext] += 1
+            self.extensions[ext] = self.extensions.get(ext, 0) + 1
+            
+            summary = None
+            if len(self._largest) < self.top_n or size > self._largest[0][0]:
+                summary = self._summary(file_data)
+                self._push_largest(size, summary)
+            if self._most_lines is None or line_count > self._most_lines['line_count']:
+                self._most_lines = summary or self._summary(file_data)
+    
+    def add_skipped(self, reason: str, count: int = 1):
+        """Compte des fichiers ignorés avant lecture (minifiés, générés...)"""
+        with self._lock:
+            self.skipped[reason] = self.skipped.get(reason, 0) + count
+    
+    def merge(self, other: 'FileStatsAccumulator'):
+        """Intègre les statistiques d'un autre accumulateur
+        
+        Les deux verrous ne sont jamais tenus ensemble: l'état de other est copié sous son
+        verrou, puis intégré sous celui de self (pas d'interblocage si a.merge(b) et
+        b.merge(a) s'exécutent en même temps).
+        """
+        if other is self:
+            return
         
-        return stats
+        with other._lock:
+            totals = (other.total_files, other.total_size, other.total_lines, other.code_files, other.code_lines)
+            languages = {lang: dict(values) for lang, values in other.languages.items()}
+            extensions = dict(other.extensions)
+            skipped = dict(other.skipped)
+            largest = list(other._largest)
+            most_lines = other._most_lines
+        
+        with self._lock:
+            total_files, total_size, total_lines, code_files, code_lines = totals
+            self.total_files += total_files
+            self.total_size += total_size
+            self.total_lines += total_lines
+            self.code_files += code_files
+            self.code_lines += code_lines
+            
+            for lang, other_stats in languages.items():
+                lang_stats = self.languages.setdefault(lang, {'count': 0, 'lines': 0, 'size': 0})
+                for key, value in other_stats.items():
+                    lang_stats[key] += value
+            
+            for ext, count in extensions.items():
+                self.extensions[ext] = self.extensions.get(ext, 0) + count
+            
+            for reason, count in skipped.items():
+                self.skipped[reason] = self.skipped.get(reason, 0) + count
+            
+            for size, _, summary in largest:
+                self._push_largest(size, summary)
+            if most_lines is not None and (
+                    self._most_lines is None or most_lines['line_count'] > self._most_lines['line_count']):
+                self._most_lines = most_lines
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Instantané des statistiques (même format que FileProcessor.get_file_stats)"""
+        with self._lock:
+            if not self.total_files:
+                return {}
+            
+            largest_files = [summary for _, _, summary in sorted(self._largest, key=lambda e: (-e[0], e[1]))]
+            return {
+                'total_files': self.total_files,
+                'total_size': self.total_size,
+                'total_lines': self.total_lines,
+                'languages': {lang: dict(values) for lang, values in self.languages.items()},
+                'extensions': dict(self.extensions),
+                'skipped': dict(self.skipped),
+                'code_files': self.code_files,
+                'code_lines': self.code_lines,
+                'largest_file': largest_files[0],
+                'largest_files': largest_files,
+                'most_lines': self._most_lines
+            }
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Source d'ingestion Git: lit les blobs d'une révision directement dans le dépôt,
+sans checkout, via un processus `git cat-file --batch` persistant.
+"""
+
+import os
+import pickle
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Set, Tuple
+
+from file_processor import FileProcessor, FileStatsAccumulator
+
+class GitSource:
+    def __init__(self, repo_path: str, file_processor: FileProcessor = None, oid_index_path: str = None,
+                 knowledge_base_id: str = None):
+        self.repo_path = repo_path
+        self.file_processor = file_processor or FileProcessor()
+        self.oid_index_path = oid_index_path
+        # Base de connaissances décrite par l'index: un index d'une autre base est ignoré
+        self.knowledge_base_id = knowledge_base_id
+        # OID des blobs déjà appris: contenu identique, inutile de le relire
+        self.learned_oids: Set[str] = set()
+        self._cat_file = None
+        self.load_oid_index()
+
+    def _git(self, *args: str) -> bytes:
+        return subprocess.run(['git', '-C', self.repo_path, *args], check=True,
+                              stdout=subprocess.PIPE, stderr=subprocess.PIPE).stdout
+
+    def resolve(self, revision: str) -> str:
+        """Résout une révision (branche, tag, sha) en identifiant de commit"""
+        return self._git('rev-parse', '--verify', f'{revision}^{{commit}}').decode().strip()
+
+    def list_blobs(self, revision: str) -> List[Tuple[str, str, int]]:
+        """Liste (oid, chemin, taille) des fichiers suivis dans l'arbre de la révision"""
+        blobs = []
+        for entry in self._git('ls-tree', '-r', '-l', '-z', revision).split(b'\0'):
+            if not entry:
+                continue
+            info, path = entry.split(b'\t', 1)
+            mode, object_type, oid, size = info.split()
+            # Les sous-modules (commit) et liens symboliques (mode 120000, dont le blob est
+            # le chemin cible) n'ont pas de contenu à apprendre
+            if object_type != b'blob' or mode == b'120000' or size == b'-':
+                continue
+            blobs.append((oid.decode(), os.fsdecode(path), int(size)))
+        return blobs
+
+    def read_blob(self, oid: str) -> bytes:
+        """Lit un blob via le processus cat-file persistant"""
+        if self._cat_file is None:
+            self._cat_file = subprocess.Popen(['git', '-C', self.repo_path, 'cat-file', '--batch'],
+                                              stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+
+        self._cat_file.stdin.write(oid.encode() + b'\n')
+        self._cat_file.stdin.flush()
+        header = self._cat_file.stdout.readline().split()
+        if len(header) != 3:
+            raise ValueError(f"Objet Git introuvable: {oid}")
+
+        data = self._cat_file.stdout.read(int(header[2]))
+        self._cat_file.stdout.read(1)  # saut de ligne final
+        return data
+
+    def iter_revision(self, revision: str, skip_learned: bool = True,
+                      progress_callback: Callable[[float], None] = None) -> Iterator[Dict[str, Any]]:
+        """Produit les enregistrements des fichiers d'une révision, un par blob distinct"""
+        commit = self.resolve(revision)
+        blobs = self.list_blobs(commit)
+        seen = set()
+
+        for i, (oid, path, size) in enumerate(blobs):
+            if progress_callback and blobs:
+                progress_callback((i + 1) / len(blobs) * 50)
+
+            if oid in seen or (skip_learned and oid in self.learned_oids):
+                continue
+            seen.add(oid)
+
+            name = os.path.basename(path)
+            # Filtrage avant lecture du blob: extension binaire ou taille excessive
+            if Path(name).suffix.lower() in self.file_processor.binary_extensions:
+                continue
+            if size > self.file_processor.max_member_size:
+                continue
+
+            try:
+                file_data = self.file_processor.process_bytes(f"{commit[:12]}:{path}", name, self.read_blob(oid))
+            except Exception as e:
+                print(f"Erreur lors de la lecture de {path} ({oid}): {e}")
+                continue
+
+            if file_data:
+                file_data['oid'] = oid
+                yield file_data
+
+    def process_revision(self, revision: str, progress_callback: Callable[[float], None] = None,
+                         stats: FileStatsAccumulator = None, skip_learned: bool = True) -> List[Dict[str, Any]]:
+        """Équivalent de FileProcessor.process_directory pour une révision Git"""
+        files_data = []
+        for file_data in self.iter_revision(revision, skip_learned, progress_callback):
+            files_data.append(file_data)
+            if stats is not None:
+                stats.add(file_data)
+        return files_data
+
+    def mark_learned(self, files_data: List[Dict[str, Any]]):
+        self.learned_oids.update(f['oid'] for f in files_data if 'oid' in f)
+
+    def save_oid_index(self):
+        """Sauvegarde les OID appris pour les entraînements incrémentaux"""
+        if self.oid_index_path is None:
+            return
+        try:
+            with open(self.oid_index_path, 'wb') as f:
+                pickle.dump({'knowledge_base_id': self.knowledge_base_id,
+                             'oids': {bytes.fromhex(oid) for oid in self.learned_oids}}, f,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            print(f"Erreur lors de la sauvegarde des OID: {e}")
+
+    def load_oid_index(self):
+        try:
+            if self.oid_index_path is not None and os.path.exists(self.oid_index_path):
+                with open(self.oid_index_path, 'rb') as f:
+                    saved = pickle.load(f)
+                # Base supprimée, réinitialisée ou importée depuis: tout est à réapprendre
+                if not isinstance(saved, dict) or saved.get('knowledge_base_id') != self.knowledge_base_id:
+                    return
+                self.learned_oids = {oid.hex() for oid in saved['oids']}
+        except Exception as e:
+            print(f"Erreur lors du chargement des OID: {e}")
+
+    def close(self):
+        if self._cat_file is not None:
+            self._cat_file.stdin.close()
+            self._cat_file.wait()
+            self._cat_file = None
+
+    def __enter__(self) -> 'GitSource':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def main():
+    if len(sys.argv) not in (2, 3):
+        print("Usage: python git_source.py <dépôt> [révision]")
+        return 1
+
+    from ai_engine import AIEngine
+    from training_manager import TrainingManager
+
+    revision = sys.argv[2] if len(sys.argv) == 3 else 'HEAD'
+    training_manager = TrainingManager(AIEngine())
+    learned = training_manager.train_git_revision(sys.argv[1], revision)
+    print(f"✅ {learned} nouveaux fichiers appris à la révision {revision}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+import multiprocessing
+from typing import Any, Dict, Optional, Tuple
+
+from ai_engine import AIEngine
+
+def _extraction_worker(connection, language_classifier):
+    """Boucle du processus isolé: extrait les caractéristiques de chaque code reçu"""
+    ai_engine = AIEngine(knowledge_base_path=None)
+    ai_engine.language_classifier = language_classifier
+    while True:
+        code = connection.recv()
+        if code is None:
+            break
+        connection.send(ai_engine.extract_code_features(code))
+
+
+class GuardedAnalyzer:
+    """Extraction des caractéristiques avec budget de temps par fichier
+
+    Les petits fichiers sans longue ligne, de loin les plus nombreux, sont analysés dans
+    le processus courant: leur coût est borné et l'aller-retour par le tube coûterait plus
+    que l'analyse. Les autres s'exécutent dans un processus séparé, tué si le budget est
+    dépassé. Les entrées pathologiques (lignes géantes, fichiers énormes) passent directement
+    par une analyse bornée; en dernier recours le fichier est ignoré.
+    """
+
+    OK = 'ok'
+    DEGRADED = 'degraded'
+    SKIPPED = 'skipped'
+
+    def __init__(self, ai_engine: AIEngine, time_budget: float = 5.0,
+                 max_line_length: int = 2000, max_bytes: int = 2 * 1024 * 1024,
+                 inline_max_bytes: int = 64 * 1024, inline_max_line_length: int = 500):
+        self.ai_engine = ai_engine
+        self.time_budget = time_budget
+        self.max_line_length = max_line_length
+        self.max_bytes = max_bytes
+        self.inline_max_bytes = inline_max_bytes
+        self.inline_max_line_length = inline_max_line_length
+        self._process = None
+        self._connection = None
+
+    def _start_worker(self):
+        parent_connection, child_connection = multiprocessing.Pipe()
+        self._process = multiprocessing.Process(
+            target=_extraction_worker,
+            args=(child_connection, self.ai_engine.language_classifier),
+            daemon=True
+        )
+        self._process.start()
+        child_connection.close()
+        self._connection = parent_connection
+
+    def _kill_worker(self):
+        if self._process is not None:
+            self._process.kill()
+            self._process.join()
+            self._connection.close()
+            self._process = None
+            self._connection = None
+
+    def _run_with_budget(self, code: str) -> Optional[Dict[str, Any]]:
+        """Extrait dans le processus isolé; None si le budget est dépassé"""
+        if self._process is None or not self._process.is_alive():
+            self._start_worker()
+
+        self._connection.send(code)
+        if self._connection.poll(self.time_budget):
+            try:
+                return self._connection.recv()
+            except EOFError:
+                pass
+
+        self._kill_worker()
+        return None
+
+    def is_cheap(self, code: str) -> bool:
+        """Entrées assez petites pour être analysées sans processus isolé"""
+        if len(code) > self.inline_max_bytes:
+            return False
+        return all(len(line) <= self.inline_max_line_length for line in code.split('\n'))
+
+    def is_pathological(self, code: str) -> bool:
+        """Entrées connues pour rendre les expressions régulières très lentes"""
+        if len(code) > self.max_bytes:
+            return True
+        return any(len(line) > self.max_line_length for line in code.split('\n'))
+
+    def bounded_code(self, code: str) -> str:
+        """Version tronquée du code: taille totale et longueur de ligne plafonnées"""
+        lines = []
+        size = 0
+        for line in code[:self.max_bytes].split('\n'):
+            line = line[:self.max_line_length]
+            lines.append(line)
+            size += len(line) + 1
+            if size >= self.max_bytes:
+                break
+        return '\n'.join(lines)
+
+    def extract(self, code: str) -> Tuple[Optional[Dict[str, Any]], str]:
+        """Retourne (caractéristiques ou None, statut ok/degraded/skipped)"""
+        if self.is_cheap(code):
+            return self.ai_engine.extract_code_features(code), self.OK
+
+        if not self.is_pathological(code):
+            features = self._run_with_budget(code)
+            if features is not None:
+                return features, self.OK
+
+        features = self._run_with_budget(self.bounded_code(code))
+        if features is not None:
+            # Le nombre de lignes reste celui du fichier complet
+            features['lines_count'] = code.count('\n') + 1
+            return features, self.DEGRADED
+
+        return None, self.SKIPPED
+
+    def close(self):
+        if self._process is not None:
+            try:
+                self._connection.send(None)
+            except (OSError, ValueError):
+                pass
+            self._process.join(timeout=1)
+            self._kill_worker()
+
+    def __enter__(self) -> 'GuardedAnalyzer':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -21,7 +21,8 @@ def main():
     
     # Liste des dépendances requises
     dependencies = [
-        "chardet>=5.0.0"
+        "chardet>=5.0.0",
+        "numpy>=1.20.0"
     ]
     
     print("📦 Dépendances à installer:")
@@ -47,7 +48,7 @@ def main():
         print("   python run_app.py")
     else:
         print("⚠️  Certaines dépendances n'ont pas pu être installées.")
-        print("   Essayez d'installer manuellement avec: pip install chardet")
+        print("   Essayez d'installer manuellement avec: pip install chardet numpy")
     
     input("\nAppuyez sur Entrée pour continuer...")
 
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Instantanés portables de la base de connaissances: export, fusion et diff
+"""
+
+import argparse
+import pickle
+import socket
+import sys
+import time
+from typing import Any, Dict, List, Tuple
+
+from ai_engine import AIEngine
+
+SNAPSHOT_MAGIC = 'ai-desktop-kb-snapshot'
+SNAPSHOT_VERSION = 1
+
+def save_snapshot(ai_engine: AIEngine, snapshot_path: str, metadata: Dict[str, Any] = None):
+    """Écrit un instantané versionné de la base de connaissances d'un moteur"""
+    snapshot_metadata = {
+        'created': time.time(),
+        'host': socket.gethostname(),
+        'languages': sorted(ai_engine.knowledge_base.keys()),
+        'file_count': sum(kb.get('file_count', 0) for kb in ai_engine.knowledge_base.values())
+    }
+    snapshot_metadata.update(metadata or {})
+    
+    with open(snapshot_path, 'wb') as f:
+        pickle.dump({
+            'magic': SNAPSHOT_MAGIC,
+            'version': SNAPSHOT_VERSION,
+            'metadata': snapshot_metadata,
+            'knowledge_base': ai_engine.get_knowledge_base_state()
+        }, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+def load_snapshot(snapshot_path: str) -> Tuple[AIEngine, Dict[str, Any]]:
+    """Charge un instantané dans un moteur en mémoire"""
+    with open(snapshot_path, 'rb') as f:
+        snapshot = pickle.load(f)
+    
+    if not isinstance(snapshot, dict) or snapshot.get('magic') != SNAPSHOT_MAGIC:
+        raise ValueError(f"{snapshot_path} n'est pas un instantané de base de connaissances")
+    if snapshot['version'] > SNAPSHOT_VERSION:
+        raise ValueError(f"Version d'instantané non supportée: {snapshot['version']}")
+    
+    ai_engine = AIEngine(knowledge_base_path=None)
+    ai_engine.set_knowledge_base_state(snapshot['knowledge_base'])
+    return ai_engine, snapshot['metadata']
+
+def merge_snapshots(snapshot_paths: List[str], output_path: str) -> Dict[str, Any]:
+    """Fusionne plusieurs instantanés (un par shard) en un seul"""
+    if not snapshot_paths:
+        raise ValueError("Aucun instantané à fusionner")
+    
+    merged = AIEngine(knowledge_base_path=None)
+    shards = []
+    for snapshot_path in snapshot_paths:
+        ai_engine, metadata = load_snapshot(snapshot_path)
+        merged.merge_knowledge_base(ai_engine)
+        # Les métadonnées d'un instantané déjà fusionné sont aplaties
+        shards.extend(metadata.get('shards', [metadata]))
+    
+    metadata = {'shards': shards}
+    save_snapshot(merged, output_path, metadata)
+    return metadata
+
+def diff_snapshots(base_path: str, new_path: str) -> Dict[str, Any]:
+    """Calcule ce qu'un instantané apporte par rapport à une base"""
+    base_engine, _ = load_snapshot(base_path)
+    new_engine, new_metadata = load_snapshot(new_path)
+    
+    diff = {'metadata': new_metadata, 'languages': {}}
+    for language, new_kb in new_engine.knowledge_base.items():
+        base_kb = base_engine.knowledge_base.get(language)
+        language_diff = {
+            'new_language': base_kb is None,
+            'file_count': new_kb.get('file_count', 0),
+            'total_lines': new_kb.get('total_lines', 0)
+        }
+        for key in AIEngine.SYMBOL_KEYS:
+            added = new_kb[key] if base_kb is None else new_kb[key].difference(base_kb[key])
+            language_diff[key] = {'added': len(added), 'examples': [name for name, _ in added.most_common(5)]}
+        diff['languages'][language] = language_diff
+    
+    return diff
+
+def format_diff(diff: Dict[str, Any]) -> str:
+    """Met en forme un diff pour l'affichage"""
+    lines = []
+    shard = diff['metadata'].get('shard') or diff['metadata'].get('source', '')
+    lines.append(f"=== APPORT DE L'INSTANTANÉ {shard} ===")
+    
+    for language, language_diff in sorted(diff['languages'].items()):
+        marker = " (nouveau)" if language_diff['new_language'] else ""
+        lines.append(f"{language}{marker}: {language_diff['file_count']} fichiers, "
+                     f"{language_diff['total_lines']} lignes")
+        for key in AIEngine.SYMBOL_KEYS:
+            added = language_diff[key]
+            if added['added']:
+                lines.append(f"  + {added['added']} {key}: {', '.join(added['examples'])}")
+    
+    return "\n".join(lines)
+
+def train_shard(folder_path: str, output_path: str, shard: str = None):
+    """Entraîne un moteur en mémoire sur un dossier et écrit son instantané"""
+    from file_processor import FileProcessor, FileStatsAccumulator
+    from training_manager import TrainingManager
+    
+    ai_engine = AIEngine(knowledge_base_path=None)
+    file_stats = FileStatsAccumulator()
+    files_data = FileProcessor().process_directory(folder_path, stats=file_stats)
+    TrainingManager(ai_engine).train(files_data, file_stats=file_stats)
+    save_snapshot(ai_engine, output_path, {'shard': shard or folder_path, 'source': folder_path})
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Instantanés de la base de connaissances")
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    export_parser = commands.add_parser('export', help="Exporter une base de connaissances en instantané")
+    export_parser.add_argument('knowledge_base')
+    export_parser.add_argument('output')
+    export_parser.add_argument('--shard')
+    
+    train_parser = commands.add_parser('train', help="Entraîner un dossier (shard) vers un instantané")
+    train_parser.add_argument('folder')
+    train_parser.add_argument('output')
+    train_parser.add_argument('--shard')
+    
+    merge_parser = commands.add_parser('merge', help="Fusionner des instantanés")
+    merge_parser.add_argument('output')
+    merge_parser.add_argument('snapshots', nargs='+')
+    
+    diff_parser = commands.add_parser('diff', help="Afficher l'apport d'un instantané")
+    diff_parser.add_argument('base')
+    diff_parser.add_argument('new')
+    
+    import_parser = commands.add_parser('import', help="Écrire un instantané comme base de connaissances")
+    import_parser.add_argument('snapshot')
+    import_parser.add_argument('knowledge_base')
+    
+    args = parser.parse_args(argv)
+    
+    try:
+        if args.command == 'export':
+            save_snapshot(AIEngine(knowledge_base_path=args.knowledge_base), args.output,
+                          {'shard': args.shard or args.knowledge_base})
+        elif args.command == 'train':
+            train_shard(args.folder, args.output, args.shard)
+        elif args.command == 'merge':
+            metadata = merge_snapshots(args.snapshots, args.output)
+            print(f"✅ {len(metadata['shards'])} shards fusionnés dans {args.output}")
+        elif args.command == 'diff':
+            print(format_diff(diff_snapshots(args.base, args.new)))
+        elif args.command == 'import':
+            ai_engine, _ = load_snapshot(args.snapshot)
+            ai_engine.knowledge_base_path = args.knowledge_base
+            ai_engine.save_knowledge_base()
+    except (OSError, ValueError) as e:
+        print(f"❌ Erreur: {e}")
+        return 1
+    
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
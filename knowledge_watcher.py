@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Mode surveillance: maintient la base de connaissances à jour à partir d'un dossier
+"""
+
+import ctypes
+import ctypes.util
+import os
+import pickle
+import select
+import struct
+import sys
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Set, Tuple
+
+import numpy as np
+
+from ai_engine import AIEngine
+from file_processor import FileProcessor
+
+# Constantes inotify (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+              | IN_CREATE | IN_DELETE | IN_DELETE_SELF)
+EVENT_HEADER = struct.Struct('iIII')
+
+class InotifyWatcher:
+    """Surveillance récursive d'un dossier via inotify (Linux uniquement, sans dépendance)"""
+
+    def __init__(self, folder_path: str):
+        libc_name = ctypes.util.find_library('c') or 'libc.so.6'
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(self._libc, 'inotify_init1'):
+            raise OSError("inotify indisponible")
+
+        self.fd = self._libc.inotify_init1(os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 a échoué")
+
+        self.overflowed = False
+        self._watches = {}
+        for directory, _, _ in os.walk(folder_path):
+            self._add_watch(directory)
+
+    def _add_watch(self, directory: str):
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+        if wd >= 0:
+            self._watches[wd] = directory
+
+    def read_events(self, timeout: float) -> Set[str]:
+        """Retourne les chemins modifiés (fichiers ou dossiers) reçus avant le délai"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+
+        data = os.read(self.fd, 65536)
+        changed = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, name_length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + name_length].rstrip(b'\0')
+            offset += name_length
+
+            if mask & IN_Q_OVERFLOW:
+                self.overflowed = True
+                continue
+            if mask & IN_IGNORED:
+                self._watches.pop(wd, None)
+                continue
+
+            directory = self._watches.get(wd)
+            if directory is None:
+                continue
+            path = os.path.join(directory, os.fsdecode(name)) if name else directory
+
+            # Nouveau sous-dossier: le surveiller ainsi que son contenu déjà présent
+            if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                for sub_directory, _, files in os.walk(path):
+                    self._add_watch(sub_directory)
+                    changed.update(os.path.join(sub_directory, f) for f in files)
+            changed.add(path)
+
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+class KnowledgeWatcher:
+    """Met à jour la base de connaissances par lots à partir des fichiers modifiés"""
+
+    def __init__(self, ai_engine: AIEngine, folder_path: str, file_processor: FileProcessor = None,
+                 debounce: float = 1.0, poll_interval: float = 2.0, index_path: str = None):
+        self.ai_engine = ai_engine
+        self.folder_path = os.path.abspath(folder_path)
+        self.file_processor = file_processor or FileProcessor()
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        if index_path is None:
+            base_dir = os.path.dirname(ai_engine.knowledge_base_path or '')
+            index_path = os.path.join(base_dir, 'watch_index.pkl')
+        self.index_path = index_path
+        # chemin -> {'mtime', 'size', 'contributions'}; une archive porte celles de ses membres
+        self.index = {}
+        self._stop_event = threading.Event()
+        self.load_index()
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        """Signature (mtime, taille) de chaque fichier du dossier"""
+        signatures = {}
+        for directory, _, files in os.walk(self.folder_path):
+            for name in files:
+                path = os.path.join(directory, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                signatures[path] = (stat.st_mtime_ns, stat.st_size)
+        return signatures
+
+    def _changed_since_index(self) -> Set[str]:
+        """Chemins créés, modifiés ou supprimés par rapport à l'index"""
+        signatures = self._scan()
+        changed = {path for path in self.index if path not in signatures}
+        for path, (mtime, size) in signatures.items():
+            entry = self.index.get(path)
+            if entry is None or entry['mtime'] != mtime or entry['size'] != size:
+                changed.add(path)
+        return changed
+
+    def apply_changes(self, paths: Iterable[str]) -> Dict[str, int]:
+        """Réapprend les fichiers modifiés et oublie les fichiers supprimés, puis sauvegarde"""
+        summary = {'updated': 0, 'removed': 0}
+
+        for path in sorted(set(paths)):
+            # Les fichiers d'un dossier existant sont signalés individuellement
+            if os.path.isdir(path):
+                continue
+
+            targets = [path]
+            if not os.path.isfile(path):
+                # Un dossier supprimé ou déplacé emporte tous les fichiers indexés dessous
+                prefix = path.rstrip(os.sep) + os.sep
+                targets.extend(p for p in self.index if p.startswith(prefix))
+
+            for target in targets:
+                entry = self.index.pop(target, None)
+                if entry is not None:
+                    for contribution in entry['contributions']:
+                        self.ai_engine.forget_contribution(contribution)
+
+                if not os.path.isfile(target):
+                    if entry is not None:
+                        summary['removed'] += 1
+                    continue
+
+                try:
+                    stat = os.stat(target)
+                    if self.file_processor.process_archives and self.file_processor.is_archive(target):
+                        records = list(self.file_processor.process_archive(target))
+                    else:
+                        records = [self.file_processor.process_file(target)]
+                except Exception as e:
+                    print(f"Erreur lors du traitement de {target}: {e}")
+                    continue
+
+                contributions = [
+                    self.ai_engine.learn_from_code(file_data['content'], file_data['path'])
+                    for file_data in records
+                    if file_data and file_data['is_code'] and file_data['content'] and not file_data.get('content_flag')
+                ]
+                self.index[target] = {'mtime': stat.st_mtime_ns, 'size': stat.st_size,
+                                      'contributions': contributions}
+                summary['updated'] += 1
+
+        if summary['updated'] or summary['removed']:
+            self.ai_engine.save_knowledge_base()
+            self.save_index()
+            # Une reconstruction par lot, pas par fichier appris
+            self.ai_engine.rebuild_completion_indexes()
+        return summary
+
+    def seed_index(self, contributions: Dict[str, List[Dict]]):
+        """Initialise l'index après un entraînement du dossier, sans rien réapprendre
+        
+        contributions: chemin -> contributions des fichiers appris (voir TrainingManager.train);
+        celles des membres d'une archive sont rattachées à l'archive. Les autres fichiers du
+        dossier (non appris, ou hors échantillon) sont indexés sans contribution. Sans cela, la
+        première surveillance d'un dossier déjà entraîné apprendrait chaque fichier une seconde fois.
+        """
+        contributions = {os.path.abspath(path): path_contributions
+                         for path, path_contributions in contributions.items()}
+        self.index = {
+            path: {'mtime': mtime, 'size': size, 'contributions': contributions.get(path, [])}
+            for path, (mtime, size) in self._scan().items()
+        }
+        self.save_index()
+    
+    def sync(self) -> Dict[str, int]:
+        """Rattrape les changements survenus pendant que la surveillance était arrêtée"""
+        return self.apply_changes(self._changed_since_index())
+
+    def run(self, on_batch: Callable[[Dict[str, int]], None] = None):
+        """Boucle de surveillance (inotify, ou scrutation périodique à défaut)"""
+        self._stop_event.clear()
+        try:
+            inotify = InotifyWatcher(self.folder_path)
+        except (OSError, AttributeError):
+            inotify = None
+
+        try:
+            # Synchroniser après la pose des watches pour ne rien manquer entre les deux
+            self._report(self.sync(), on_batch)
+            while not self._stop_event.is_set():
+                if inotify is None:
+                    self._stop_event.wait(self.poll_interval)
+                    changed = self._changed_since_index()
+                else:
+                    changed = inotify.read_events(timeout=0.5)
+                    if not changed:
+                        continue
+                    # Regrouper les événements tant que le dossier reste actif
+                    deadline = time.time() + self.debounce
+                    while time.time() < deadline and not self._stop_event.is_set():
+                        changed |= inotify.read_events(timeout=max(deadline - time.time(), 0))
+                    if inotify.overflowed:
+                        inotify.overflowed = False
+                        changed |= self._changed_since_index()
+
+                if changed:
+                    self._report(self.apply_changes(changed), on_batch)
+        finally:
+            if inotify is not None:
+                inotify.close()
+
+    def _report(self, summary: Dict[str, int], on_batch: Callable[[Dict[str, int]], None]):
+        if on_batch and (summary['updated'] or summary['removed']):
+            on_batch(summary)
+
+    def stop(self):
+        self._stop_event.set()
+
+    def save_index(self):
+        """Sauvegarde l'index des fichiers surveillés et de leurs contributions"""
+        try:
+            with open(self.index_path, 'wb') as f:
+                pickle.dump({'folder': self.folder_path, 'files': self.index}, f,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            print(f"Erreur lors de la sauvegarde de l'index: {e}")
+
+    def _drop_symbol_id_contributions(self):
+        """Écarte les contributions enregistrées sous forme d'identifiants de symboles
+        
+        Ces identifiants ne désignent plus les mêmes symboles après un compactage du pool:
+        les oublier retirerait d'autres compteurs. Les fichiers restent indexés.
+        """
+        dropped = 0
+        for entry in self.index.values():
+            kept = [contribution for contribution in entry['contributions']
+                    if not any(isinstance(contribution[key], np.ndarray) for key in AIEngine.SYMBOL_KEYS)]
+            dropped += len(entry['contributions']) - len(kept)
+            entry['contributions'] = kept
+        if dropped:
+            print(f"Index de surveillance: {dropped} contributions d'un ancien format ignorées")
+
+    def load_index(self):
+        """Charge l'index s'il correspond au dossier surveillé"""
+        try:
+            if os.path.exists(self.index_path):
+                with open(self.index_path, 'rb') as f:
+                    saved = pickle.load(f)
+                if saved.get('folder') == self.folder_path:
+                    self.index = saved['files']
+                    # Ancien format: une seule contribution par fichier
+                    for entry in self.index.values():
+                        if 'contribution' in entry:
+                            contribution = entry.pop('contribution')
+                            entry['contributions'] = [contribution] if contribution is not None else []
+                    self._drop_symbol_id_contributions()
+        except Exception as e:
+            print(f"Erreur lors du chargement de l'index: {e}")
+
+def main():
+    if len(sys.argv) != 2:
+        print("Usage: python knowledge_watcher.py <dossier>")
+        return 1
+
+    watcher = KnowledgeWatcher(AIEngine(), sys.argv[1])
+    print(f"👀 Surveillance de {watcher.folder_path} (Ctrl+C pour arrêter)")
+    try:
+        watcher.run(lambda summary: print(f"🔄 {summary['updated']} fichiers appris, "
+                                          f"{summary['removed']} supprimés"))
+    except KeyboardInterrupt:
+        watcher.stop()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
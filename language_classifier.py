@@ -0,0 +1,196 @@
+import re
+import zlib
+from typing import List, Tuple, Iterable, Sequence
+import numpy as np
+
+class LanguageClassifier:
+    """Classifieur bayésien naïf multinomial sur des vecteurs de n-grammes hachés"""
+
+    TOKEN_PATTERN = re.compile(r'[A-Za-z_]\w*|[^\w\s]{1,3}')
+
+    def __init__(self, n_features: int = 2 ** 14, max_bytes: int = 65536,
+                 alpha: float = 0.1, batch_size: int = 256):
+        self.n_features = n_features
+        self.max_bytes = max_bytes
+        self.alpha = alpha
+        self.batch_size = batch_size
+        self.classes = []
+        # Comptes cumulés (additifs): un nouvel entraînement s'ajoute aux précédents
+        self.feature_counts = None
+        self.class_count = None
+        self.feature_log_prob = None
+        self.class_log_prior = None
+        self._token_cache = {}
+
+    @property
+    def is_fitted(self) -> bool:
+        return self.feature_log_prob is not None
+
+    def _token_index(self, token: str) -> int:
+        index = self._token_cache.get(token)
+        if index is None:
+            if len(self._token_cache) > 200000:
+                self._token_cache.clear()
+            index = zlib.crc32(token.encode('utf-8', 'ignore')) % self.n_features
+            self._token_cache[token] = index
+        return index
+
+    def vectorize(self, code: str) -> np.ndarray:
+        """Transforme un code en vecteur de taille fixe (n-grammes d'octets + tokens)"""
+        raw = code.encode('utf-8', 'ignore')[:self.max_bytes]
+        counts = np.zeros(self.n_features, dtype=np.float32)
+        if not raw:
+            return counts
+
+        data = np.frombuffer(raw, dtype=np.uint8).astype(np.uint64)
+        if len(data) >= 2:
+            bigrams = (data[:-1] * np.uint64(1000003)) ^ data[1:]
+            counts += np.bincount((bigrams % np.uint64(self.n_features)).astype(np.intp),
+                                  minlength=self.n_features)
+        if len(data) >= 3:
+            trigrams = ((data[:-2] * np.uint64(1000003) ^ data[1:-1]) * np.uint64(2654435761)) ^ data[2:]
+            counts += np.bincount((trigrams % np.uint64(self.n_features)).astype(np.intp),
+                                  minlength=self.n_features)
+
+        # Les tokens (mots-clés, opérateurs) sont plus discriminants que les octets
+        tokens = self.TOKEN_PATTERN.findall(raw.decode('utf-8', 'ignore'))
+        if tokens:
+            indices = np.fromiter((self._token_index(t) for t in tokens), dtype=np.intp, count=len(tokens))
+            counts += 4 * np.bincount(indices, minlength=self.n_features)
+
+        # Atténuation sublinéaire et normalisation: le score ne dépend plus de la longueur
+        np.log1p(counts, out=counts)
+        total = counts.sum()
+        if total > 0:
+            counts *= 100.0 / total
+        return counts
+
+    def transform(self, codes: Sequence[str]) -> np.ndarray:
+        """Vectorise un lot de codes en une matrice (n_codes, n_features)"""
+        matrix = np.zeros((len(codes), self.n_features), dtype=np.float32)
+        for i, code in enumerate(codes):
+            matrix[i] = self.vectorize(code)
+        return matrix
+
+    def _batches(self, codes: Sequence[str]) -> Iterable[Tuple[int, np.ndarray]]:
+        for start in range(0, len(codes), self.batch_size):
+            yield start, self.transform(codes[start:start + self.batch_size])
+
+    @property
+    def is_updatable(self) -> bool:
+        """Faux pour un modèle d'ancien format, sauvegardé sans ses comptes"""
+        return self.feature_counts is not None or self.feature_log_prob is None
+
+    def fit(self, codes: Sequence[str], labels: Sequence[str]) -> 'LanguageClassifier':
+        """Entraîne le modèle à partir de codes étiquetés (remplace l'entraînement précédent)"""
+        if len(set(labels)) < 2:
+            raise ValueError("Au moins deux langages sont nécessaires pour l'entraînement")
+
+        self.classes = []
+        self.feature_counts = None
+        self.class_count = None
+        self.feature_log_prob = None
+        self.class_log_prior = None
+        return self.partial_fit(codes, labels)
+
+    def partial_fit(self, codes: Sequence[str], labels: Sequence[str]) -> 'LanguageClassifier':
+        """Ajoute des codes étiquetés aux comptes existants; les nouveaux langages sont ajoutés
+
+        Le modèle n'est utilisable (is_fitted) qu'à partir de deux langages connus.
+        """
+        if len(codes) != len(labels):
+            raise ValueError("Le nombre de codes et d'étiquettes doit être identique")
+        if not self.is_updatable:
+            raise ValueError("Modèle sauvegardé sans ses comptes: un entraînement complet est nécessaire")
+
+        new_classes = sorted(set(labels) - set(self.classes))
+        if self.feature_counts is None:
+            self.feature_counts = np.zeros((0, self.n_features), dtype=np.float64)
+            self.class_count = np.zeros(0, dtype=np.int64)
+        if new_classes:
+            self.classes = self.classes + new_classes
+            self.feature_counts = np.vstack((self.feature_counts,
+                                             np.zeros((len(new_classes), self.n_features), dtype=np.float64)))
+            self.class_count = np.concatenate((self.class_count, np.zeros(len(new_classes), dtype=np.int64)))
+
+        class_index = {label: i for i, label in enumerate(self.classes)}
+        y = np.array([class_index[label] for label in labels], dtype=np.intp)
+
+        for start, matrix in self._batches(codes):
+            batch_y = y[start:start + len(matrix)]
+            one_hot = np.zeros((len(matrix), len(self.classes)), dtype=np.float32)
+            one_hot[np.arange(len(matrix)), batch_y] = 1
+            self.feature_counts += one_hot.T @ matrix
+        self.class_count += np.bincount(y, minlength=len(self.classes))
+
+        self._update_log_probabilities()
+        return self
+
+    def _update_log_probabilities(self):
+        if len(self.classes) < 2:
+            return
+        smoothed = self.feature_counts + self.alpha
+        self.feature_log_prob = (np.log(smoothed) - np.log(smoothed.sum(axis=1, keepdims=True))).astype(np.float32)
+        self.class_log_prior = np.log(self.class_count / self.class_count.sum()).astype(np.float32)
+
+    def accuracy(self, codes: Sequence[str], labels: Sequence[str]) -> float:
+        """Proportion de codes correctement classés"""
+        if not len(codes):
+            return 0.0
+        return sum(p == l for p, l in zip(self.predict(codes), labels)) / len(codes)
+
+    def predict_proba(self, codes: Sequence[str]) -> np.ndarray:
+        """Retourne la matrice des probabilités (n_codes, n_langages)"""
+        if not self.is_fitted:
+            raise ValueError("Le classifieur n'est pas entraîné")
+
+        probabilities = np.zeros((len(codes), len(self.classes)), dtype=np.float32)
+        for start, matrix in self._batches(codes):
+            joint = matrix @ self.feature_log_prob.T + self.class_log_prior
+            joint -= joint.max(axis=1, keepdims=True)
+            np.exp(joint, out=joint)
+            joint /= joint.sum(axis=1, keepdims=True)
+            probabilities[start:start + len(matrix)] = joint
+        return probabilities
+
+    def predict_with_confidence(self, codes: Sequence[str]) -> List[Tuple[str, float]]:
+        """Prédit le langage de chaque code avec sa probabilité"""
+        if not len(codes):
+            return []
+        probabilities = self.predict_proba(codes)
+        best = probabilities.argmax(axis=1)
+        return [(self.classes[i], float(probabilities[row, i])) for row, i in enumerate(best)]
+
+    def predict(self, codes: Sequence[str]) -> List[str]:
+        """Prédit le langage de chaque code"""
+        return [language for language, _ in self.predict_with_confidence(codes)]
+
+    def save(self, file_path: str):
+        """Sauvegarde le modèle au format .npz (avec les comptes, pour les entraînements suivants)"""
+        arrays = {}
+        if self.feature_log_prob is not None:
+            arrays.update(feature_log_prob=self.feature_log_prob, class_log_prior=self.class_log_prior)
+        if self.feature_counts is not None:
+            arrays.update(feature_counts=self.feature_counts, class_count=self.class_count)
+        np.savez(
+            file_path,
+            classes=np.array(self.classes, dtype=str),
+            params=np.array([self.n_features, self.max_bytes], dtype=np.int64),
+            alpha=np.array(self.alpha),
+            **arrays
+        )
+
+    @classmethod
+    def load(cls, file_path: str) -> 'LanguageClassifier':
+        """Charge un modèle sauvegardé"""
+        with np.load(file_path) as data:
+            n_features, max_bytes = (int(v) for v in data['params'])
+            classifier = cls(n_features=n_features, max_bytes=max_bytes, alpha=float(data['alpha']))
+            classifier.classes = [str(c) for c in data['classes']]
+            if 'feature_log_prob' in data:
+                classifier.feature_log_prob = data['feature_log_prob']
+                classifier.class_log_prior = data['class_log_prior']
+            if 'feature_counts' in data:
+                classifier.feature_counts = data['feature_counts']
+                classifier.class_count = data['class_count']
+        return classifier
@@ -2,20 +2,34 @@ import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
 import threading
 import os
+import re
 from pathlib import Path
 import sys
 
 # Ajoutez cette vérification au début
 try:
     from ai_engine import AIEngine
-    from file_processor import FileProcessor  
+    from file_processor import FileProcessor, FileStatsAccumulator
     from training_manager import TrainingManager
+    from knowledge_watcher import KnowledgeWatcher
+    from virtual_text import VirtualFileView, PagedTextWriter
 except ImportError as e:
     print(f"Erreur d'import: {e}")
     print("Assurez-vous que tous les fichiers sont dans le même dossier")
     sys.exit(1)
 
 class AIDesktopApp:
+    # Au-delà de cette taille, le fichier est affiché en vue virtualisée (lecture seule)
+    LARGE_FILE_THRESHOLD = 1024 * 1024
+    # Mode échantillonnage: nombre de fichiers visé et durée maximale (secondes)
+    SAMPLE_TARGET_FILES = 10000
+    SAMPLE_TIME_LIMIT = 600
+    # Complétion des symboles appris: longueur minimale du préfixe et nombre de propositions
+    COMPLETION_MIN_PREFIX = 2
+    COMPLETION_COUNT = 8
+    # Délai (ms) sans frappe avant de redétecter le langage de l'éditeur
+    LANGUAGE_DETECTION_DELAY = 500
+    
     def __init__(self, root):
         self.root = root
         self.root.title("IA Universelle - Analyseur de Code")
@@ -24,10 +38,20 @@ class AIDesktopApp:
         # Initialisation des composants
         self.ai_engine = AIEngine()
         self.file_processor = FileProcessor()
-        self.training_manager = TrainingManager(self.ai_engine)
+        self.training_manager = TrainingManager(self.ai_engine, time_budget=10.0)
+        self.file_stats = None
+        self.watcher = None
+        self.training_thread = None
+        self.loaded_file_path = None
+        # Langage de l'éditeur, redétecté après une pause de frappe plutôt qu'à chaque touche
+        self.editor_language = 'unknown'
+        self._language_job = None
         
         self.setup_ui()
         
+        # Index de complétion de la base chargée, construits hors du thread de l'interface
+        threading.Thread(target=self.ai_engine.rebuild_completion_indexes, daemon=True).start()
+        
     def setup_ui(self):
         # Frame principal
         main_frame = ttk.Frame(self.root, padding="10")
@@ -59,11 +83,19 @@ class AIDesktopApp:
         ttk.Button(training_frame, text="Commencer Entraînement", 
                   command=self.start_training).grid(row=0, column=2)
         
+        self.watch_button_var = tk.StringVar(value="Surveiller Dossier")
+        ttk.Button(training_frame, textvariable=self.watch_button_var,
+                  command=self.toggle_watch).grid(row=0, column=3, padx=(10, 0))
+        
         # Barre de progression
         self.progress_var = tk.DoubleVar()
         self.progress_bar = ttk.Progressbar(training_frame, variable=self.progress_var, 
                                           maximum=100)
-        self.progress_bar.grid(row=1, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=(10, 0))
+        self.progress_bar.grid(row=1, column=0, columnspan=4, sticky=(tk.W, tk.E), pady=(10, 0))
+        
+        self.sample_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(training_frame, text="Échantillonnage (gros corpus)",
+                       variable=self.sample_var).grid(row=2, column=0, columnspan=2, sticky=tk.W, pady=(5, 0))
         
         # Section d'analyse
         analysis_frame = ttk.LabelFrame(main_frame, text="Analyse de Code", padding="10")
@@ -89,6 +121,21 @@ class AIDesktopApp:
         # Zone de texte pour le code
         self.code_text = scrolledtext.ScrolledText(analysis_frame, height=15, width=80)
         self.code_text.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(0, 10))
+        self.code_text.bind('<<Modified>>', self._on_code_modified)
+        
+        # Liste de complétion affichée sous le curseur de code_text
+        self.completion_box = tk.Listbox(self.code_text, height=self.COMPLETION_COUNT, exportselection=False)
+        self.completion_box.bind('<ButtonRelease-1>', self._accept_completion)
+        self.code_text.bind('<KeyRelease>', self._on_code_key_release)
+        self.code_text.bind('<Down>', lambda event: self._move_completion(1))
+        self.code_text.bind('<Up>', lambda event: self._move_completion(-1))
+        self.code_text.bind('<Tab>', self._accept_completion)
+        self.code_text.bind('<Return>', self._accept_completion)
+        self.code_text.bind('<Escape>', lambda event: self._hide_completions())
+        self.code_text.bind('<FocusOut>', lambda event: self.root.after(100, self._hide_completions))
+        
+        # Vue virtualisée pour les gros fichiers, affichée à la place de code_text
+        self.file_view = VirtualFileView(analysis_frame, height=15, width=80)
         
         # Zone de résultats
         results_frame = ttk.LabelFrame(analysis_frame, text="Résultats d'Analyse", padding="10")
@@ -97,6 +144,7 @@ class AIDesktopApp:
         
         self.results_text = scrolledtext.ScrolledText(results_frame, height=8, width=80)
         self.results_text.grid(row=0, column=0, sticky=(tk.W, tk.E))
+        self.results_writer = PagedTextWriter(self.results_text)
         
         # Status bar
         self.status_var = tk.StringVar()
@@ -116,19 +164,54 @@ class AIDesktopApp:
             messagebox.showwarning("Attention", "Veuillez sélectionner un dossier d'entraînement")
             return
         
+        # Surveillance et entraînement apprendraient les mêmes fichiers deux fois
+        if self.watcher is not None:
+            messagebox.showwarning("Attention", "Arrêtez la surveillance avant de lancer un entraînement")
+            return
+        if self.training_thread is not None and self.training_thread.is_alive():
+            messagebox.showwarning("Attention", "Un entraînement est déjà en cours")
+            return
+        
         # Lancer l'entraînement dans un thread séparé
-        threading.Thread(target=self._train_ai, args=(folder_path,), daemon=True).start()
+        self.training_thread = threading.Thread(target=self._train_ai, args=(folder_path,), daemon=True)
+        self.training_thread.start()
     
     def _train_ai(self, folder_path):
         try:
             self.status_var.set("Entraînement en cours...")
             self.progress_var.set(0)
             
-            # Traitement des fichiers
-            files_data = self.file_processor.process_directory(folder_path, self._update_progress)
+            if self.sample_var.get():
+                # Échantillon stratifié: statistiques et progression gérées par le gestionnaire
+                self.file_stats = None
+                contributions = {}
+                report = self.training_manager.train_sample(folder_path, self.SAMPLE_TARGET_FILES,
+                                                            time_limit=self.SAMPLE_TIME_LIMIT,
+                                                            progress_callback=self._update_progress,
+                                                            file_processor=self.file_processor,
+                                                            contributions=contributions)
+                # Fichiers hors échantillon indexés sans contribution: appris seulement s'ils changent
+                KnowledgeWatcher(self.ai_engine, folder_path, self.file_processor).seed_index(contributions)
+                seen = f"au moins {report['files_seen']} (parcours interrompu)" if report['walk_truncated'] \
+                    else report['files_seen']
+                self.status_var.set(f"Entraînement terminé: {report['files_sampled']} fichiers "
+                                    f"échantillonnés sur {seen}")
+                self.progress_var.set(100)
+                messagebox.showinfo("Succès", "L'entraînement par échantillonnage est terminé!")
+                return
+            
+            # Traitement des fichiers, avec statistiques mises à jour en continu
+            self.file_stats = FileStatsAccumulator()
+            files_data = self.file_processor.process_directory(folder_path, self._update_progress,
+                                                               stats=self.file_stats)
             
             # Entraînement de l'IA
-            self.training_manager.train(files_data, self._update_progress)
+            contributions = {}
+            self.training_manager.train(files_data, self._update_progress, file_stats=self.file_stats,
+                                        contributions=contributions)
+            
+            # Le dossier entraîné est connu du mode surveillance: il ne sera pas réappris
+            KnowledgeWatcher(self.ai_engine, folder_path, self.file_processor).seed_index(contributions)
             
             self.status_var.set("Entraînement terminé avec succès")
             self.progress_var.set(100)
@@ -138,8 +221,36 @@ class AIDesktopApp:
             self.status_var.set("Erreur lors de l'entraînement")
             messagebox.showerror("Erreur", f"Erreur lors de l'entraînement: {str(e)}")
     
+    def toggle_watch(self):
+        if self.watcher is not None:
+            self.watcher.stop()
+            self.watcher = None
+            self.watch_button_var.set("Surveiller Dossier")
+            self.status_var.set("Surveillance arrêtée")
+            return
+        
+        folder_path = self.folder_path_var.get()
+        if not folder_path:
+            messagebox.showwarning("Attention", "Veuillez sélectionner un dossier à surveiller")
+            return
+        if self.training_thread is not None and self.training_thread.is_alive():
+            messagebox.showwarning("Attention", "Attendez la fin de l'entraînement avant de surveiller le dossier")
+            return
+        
+        self.watcher = KnowledgeWatcher(self.ai_engine, folder_path, self.file_processor)
+        self.watch_button_var.set("Arrêter Surveillance")
+        self.status_var.set(f"Surveillance de {os.path.basename(folder_path)}...")
+        threading.Thread(target=self.watcher.run, args=(self._on_watch_batch,), daemon=True).start()
+    
+    def _on_watch_batch(self, summary):
+        self.status_var.set(f"Base mise à jour: {summary['updated']} fichiers appris, "
+                            f"{summary['removed']} supprimés")
+    
     def _update_progress(self, value):
         self.progress_var.set(value)
+        if self.file_stats is not None and value < 50:
+            self.status_var.set(f"Entraînement en cours... {self.file_stats.total_files} fichiers, "
+                                f"{self.file_stats.total_lines} lignes")
         self.root.update_idletasks()
     
     def load_file(self):
@@ -159,15 +270,116 @@ class AIDesktopApp:
         
         if file_path:
             try:
-                with open(file_path, 'r', encoding='utf-8') as file:
-                    content = file.read()
+                if os.path.getsize(file_path) > self.LARGE_FILE_THRESHOLD:
+                    self._show_file_view(file_path)
+                else:
+                    with open(file_path, 'r', encoding='utf-8') as file:
+                        content = file.read()
+                    self._show_code_text()
                     self.code_text.delete(1.0, tk.END)
                     self.code_text.insert(1.0, content)
-                    self.status_var.set(f"Fichier chargé: {os.path.basename(file_path)}")
+                    self.code_text.edit_modified(False)
+                    self._detect_editor_language()
+                
+                self.loaded_file_path = file_path
+                self.status_var.set(f"Fichier chargé: {os.path.basename(file_path)}")
             except Exception as e:
                 messagebox.showerror("Erreur", f"Impossible de charger le fichier: {str(e)}")
     
+    def _show_file_view(self, file_path):
+        self.code_text.grid_remove()
+        self.file_view.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(0, 10))
+        self.file_view.open(file_path)
+    
+    def _show_code_text(self):
+        if self.file_view.file_path is not None:
+            self.file_view.close()
+            self.file_view.grid_remove()
+            self.code_text.grid()
+    
+    def _on_code_modified(self, event=None):
+        # Le texte saisi ne correspond plus au fichier sur disque
+        if self.code_text.edit_modified() and self.file_view.file_path is None:
+            self.loaded_file_path = None
+    
+    def _completion_prefix(self):
+        line_before_cursor = self.code_text.get('insert linestart', 'insert')
+        match = re.search(r'[\w.]+$', line_before_cursor)
+        return match.group(0) if match else ''
+    
+    def _detect_editor_language(self):
+        self._language_job = None
+        self.editor_language = self.ai_engine.detect_language(self.code_text.get('1.0', '200.0'))
+    
+    def _on_code_key_release(self, event):
+        if event.keysym in ('Up', 'Down', 'Tab', 'Return', 'Escape'):
+            return
+        
+        if self._language_job is not None:
+            self.root.after_cancel(self._language_job)
+        self._language_job = self.root.after(self.LANGUAGE_DETECTION_DELAY, self._detect_editor_language)
+        
+        prefix = self._completion_prefix()
+        if len(prefix) < self.COMPLETION_MIN_PREFIX:
+            self._hide_completions()
+            return
+        
+        # Symboles du langage de l'éditeur en priorité, sinon de toute la base
+        language = self.editor_language
+        completions = []
+        if language != 'unknown':
+            completions = self.ai_engine.complete_symbol(prefix, language, self.COMPLETION_COUNT + 1)
+        if not completions:
+            completions = self.ai_engine.complete_symbol(prefix, None, self.COMPLETION_COUNT + 1)
+        completions = [symbol for symbol, _ in completions if symbol != prefix][:self.COMPLETION_COUNT]
+        if not completions:
+            self._hide_completions()
+            return
+        
+        self.completion_box.delete(0, tk.END)
+        for symbol in completions:
+            self.completion_box.insert(tk.END, symbol)
+        self.completion_box.selection_set(0)
+        self.completion_box.configure(height=len(completions))
+        
+        x, y, _, height = self.code_text.bbox('insert') or (0, 0, 0, 0)
+        self.completion_box.place(x=x, y=y + height)
+    
+    def _completions_visible(self):
+        return self.completion_box.winfo_ismapped()
+    
+    def _hide_completions(self):
+        self.completion_box.place_forget()
+    
+    def _move_completion(self, delta):
+        if not self._completions_visible():
+            return None
+        selection = self.completion_box.curselection()
+        index = (selection[0] if selection else -1) + delta
+        index = max(0, min(index, self.completion_box.size() - 1))
+        self.completion_box.selection_clear(0, tk.END)
+        self.completion_box.selection_set(index)
+        self.completion_box.see(index)
+        return 'break'
+    
+    def _accept_completion(self, event=None):
+        if not self._completions_visible():
+            return None
+        selection = self.completion_box.curselection()
+        if selection:
+            prefix = self._completion_prefix()
+            self.code_text.delete(f'insert - {len(prefix)} chars', 'insert')
+            self.code_text.insert('insert', self.completion_box.get(selection[0]))
+        self._hide_completions()
+        self.code_text.focus_set()
+        return 'break'
+    
     def analyze_code(self):
+        # Un fichier chargé (et non modifié) est analysé en flux depuis le disque
+        if self.loaded_file_path is not None:
+            threading.Thread(target=self._analyze_code, args=(None, self.loaded_file_path), daemon=True).start()
+            return
+        
         code = self.code_text.get(1.0, tk.END).strip()
         if not code:
             messagebox.showwarning("Attention", "Veuillez entrer du code à analyser")
@@ -175,21 +387,23 @@ class AIDesktopApp:
         
         threading.Thread(target=self._analyze_code, args=(code,), daemon=True).start()
     
-    def _analyze_code(self, code):
+    def _analyze_code(self, code, file_path=None):
         try:
             self.status_var.set("Analyse en cours...")
-            self.results_text.delete(1.0, tk.END)
             
             # Analyse du code
-            analysis_result = self.ai_engine.analyze_code(code)
+            if file_path is not None:
+                analysis_result = self.ai_engine.analyze_file(file_path)
+            else:
+                analysis_result = self.ai_engine.analyze_code(code)
             
-            # Affichage des résultats
-            self.results_text.insert(tk.END, analysis_result)
+            # Affichage des résultats par pages, depuis la boucle Tk
+            self.root.after(0, self.results_writer.write, analysis_result)
             self.status_var.set("Analyse terminée")
             
         except Exception as e:
             self.status_var.set("Erreur lors de l'analyse")
-            self.results_text.insert(tk.END, f"Erreur: {str(e)}")
+            self.root.after(0, self.results_writer.write, f"Erreur: {str(e)}")
 
 def main():
     root = tk.Tk()
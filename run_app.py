@@ -21,12 +21,17 @@ def check_dependencies():
     except ImportError:
         missing_deps.append("chardet")
     
+    try:
+        import numpy
+    except ImportError:
+        missing_deps.append("numpy")
+    
     if missing_deps:
         print("❌ Dépendances manquantes:")
         for dep in missing_deps:
             print(f"  - {dep}")
         print("\nPour installer les dépendances manquantes:")
-        print("pip install chardet")
+        print("pip install chardet numpy")
         return False
     
     return True
@@ -37,7 +42,15 @@ def check_files():
         'main.py',
         'ai_engine.py', 
         'file_processor.py',
-        'training_manager.py'
+        'training_manager.py',
+        'language_classifier.py',
+        'symbol_table.py',
+        'knowledge_watcher.py',
+        'virtual_text.py',
+        'git_source.py',
+        'guarded_analysis.py',
+        'stratified_sampler.py',
+        'feature_table.py'
     ]
     
     missing_files = []
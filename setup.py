@@ -7,6 +7,7 @@ setup(
     packages=find_packages(),
     install_requires=[
         "chardet>=5.0.0",
+        "numpy>=1.20.0",
     ],
     python_requires=">=3.8",
     entry_points={
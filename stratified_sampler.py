@@ -0,0 +1,167 @@
+import os
+import random
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from file_processor import FileProcessor, FileStatsAccumulator
+
+class StratifiedSampler:
+    """Échantillonnage stratifié d'un très gros corpus pour un entraînement exploratoire
+
+    Les chemins sont échantillonnés par réservoir dans chaque strate (langage déduit de
+    l'extension) pendant le parcours, sans lire les fichiers. Les fichiers retenus sont
+    ensuite lus en alternant les strates, jusqu'au nombre de fichiers visé, au budget
+    d'octets ou à l'échéance: un arrêt anticipé garde donc un échantillon représentatif.
+    """
+
+    def __init__(self, file_processor: FileProcessor = None, target_files: int = 10000,
+                 byte_budget: Optional[int] = None, time_limit: Optional[float] = None,
+                 min_per_stratum: int = 5, seed: Optional[int] = None):
+        self.file_processor = file_processor or FileProcessor()
+        self.target_files = target_files
+        self.byte_budget = byte_budget
+        self.time_limit = time_limit
+        self.min_per_stratum = min_per_stratum
+        self._random = random.Random(seed)
+
+    def stratum(self, name: str) -> str:
+        """Strate d'un fichier d'après son nom seul (langage, sinon extension)"""
+        if self.file_processor.is_archive(name):
+            return 'archive'
+        extension = os.path.splitext(name)[1].lower()
+        language = self.file_processor.detect_file_language(extension, name, '')
+        if language != 'unknown':
+            return language
+        return extension or 'sans extension'
+
+    def _reservoirs(self, directory_path: str,
+                    deadline: Optional[float]) -> Tuple[Dict[str, List[Tuple[str, int]]], Dict[str, int], bool]:
+        """Parcourt le dossier et garde au plus target_files chemins par strate
+
+        Le booléen retourné indique un parcours interrompu à l'échéance (corpus vu partiellement).
+        """
+        reservoirs, seen = {}, {}
+        for directory, _, files in os.walk(directory_path):
+            if deadline is not None and time.time() >= deadline:
+                return reservoirs, seen, True
+            for name in files:
+                path = os.path.join(directory, name)
+                try:
+                    size = os.path.getsize(path)
+                except OSError:
+                    continue
+
+                stratum = self.stratum(name)
+                count = seen.get(stratum, 0) + 1
+                seen[stratum] = count
+                reservoir = reservoirs.setdefault(stratum, [])
+                if len(reservoir) < self.target_files:
+                    reservoir.append((path, size))
+                else:
+                    j = self._random.randrange(count)
+                    if j < self.target_files:
+                        reservoir[j] = (path, size)
+        return reservoirs, seen, False
+
+    def _allocate(self, reservoirs: Dict[str, List[Tuple[str, int]]], seen: Dict[str, int]) -> Dict[str, int]:
+        """Quota de chaque strate: proportionnel à sa taille, avec un minimum par strate"""
+        total_seen = sum(seen.values())
+        return {
+            stratum: min(len(reservoir),
+                         max(self.min_per_stratum, round(self.target_files * seen[stratum] / total_seen)))
+            for stratum, reservoir in reservoirs.items()
+        }
+
+    def sample_directory(self, directory_path: str, progress_callback: Callable[[float], None] = None,
+                         stats: FileStatsAccumulator = None) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """Retourne (enregistrements des fichiers échantillonnés, rapport d'échantillonnage)
+
+        Chaque enregistrement porte le taux d'échantillonnage de sa strate ('sampling_rate'),
+        qui permet de ramener les compteurs de la base à l'échelle du corpus complet. Si le
+        parcours a été interrompu ('walk_truncated'), les taux ne portent que sur la partie
+        parcourue: ce sont des majorants, et les comptes extrapolés des minorants
+        ('estimates' vaut alors 'lower_bound' au lieu de 'extrapolated').
+        """
+        deadline = walk_deadline = None
+        if self.time_limit is not None:
+            deadline = time.time() + self.time_limit
+            # Le parcours ne consomme au plus que la moitié du temps, le reste sert à la lecture
+            walk_deadline = time.time() + self.time_limit / 2
+        reservoirs, seen, walk_truncated = self._reservoirs(directory_path, walk_deadline)
+        quotas = self._allocate(reservoirs, seen)
+
+        # Ordre de lecture entrelacé: le k-ième fichier d'une strate de quota q passe à la position (k + 0.5) / q
+        order = []
+        for stratum, reservoir in reservoirs.items():
+            self._random.shuffle(reservoir)
+            quota = quotas[stratum]
+            order.extend(((k + 0.5) / quota, stratum, path, size)
+                         for k, (path, size) in enumerate(reservoir[:quota]))
+        order.sort(key=lambda item: item[0])
+
+        attempted = dict.fromkeys(reservoirs, 0)
+        files_data = []
+        total_bytes = 0
+        stopped_by = 'exhausted'
+        over_budget = 0
+        skipped_before = Counter(self.file_processor.skipped_counts)
+        for i, (_, stratum, path, size) in enumerate(order):
+            if len(files_data) >= self.target_files:
+                stopped_by = 'target_files'
+                break
+            if self.byte_budget is not None and total_bytes + size > self.byte_budget:
+                # Un seul gros fichier ne doit pas arrêter l'échantillon: les suivants peuvent tenir
+                over_budget += 1
+                continue
+            if deadline is not None and time.time() >= deadline:
+                stopped_by = 'deadline'
+                break
+
+            attempted[stratum] += 1
+            total_bytes += size
+            try:
+                if stratum == 'archive' and self.file_processor.process_archives:
+                    records = self.file_processor.process_archive(path)
+                else:
+                    records = [self.file_processor.process_file(path)]
+                for file_data in records:
+                    if file_data:
+                        files_data.append(file_data)
+                        if stats is not None:
+                            stats.add(file_data)
+            except Exception as e:
+                print(f"Erreur lors du traitement de {path}: {e}")
+                continue
+
+            if progress_callback:
+                progress_callback((i + 1) / len(order) * 50)
+
+        if stats is not None:
+            for reason, count in (self.file_processor.skipped_counts - skipped_before).items():
+                stats.add_skipped(reason, count)
+
+        if stopped_by == 'exhausted' and over_budget:
+            stopped_by = 'byte_budget'
+
+        rates = {stratum: attempted[stratum] / seen[stratum] for stratum in reservoirs if attempted[stratum]}
+        for file_data in files_data:
+            # Les membres d'archive héritent du taux de l'archive qui les contient
+            stratum = 'archive' if 'archive' in file_data else self.stratum(file_data['name'])
+            file_data['sampling_rate'] = rates.get(stratum, 1.0)
+
+        report = {
+            'stopped_by': stopped_by,
+            'walk_truncated': walk_truncated,
+            'estimates': 'lower_bound' if walk_truncated else 'extrapolated',
+            'files_over_budget': over_budget,
+            'files_seen': sum(seen.values()),
+            'files_sampled': len(files_data),
+            'bytes_read': total_bytes,
+            'strata': {
+                stratum: {'seen': seen[stratum], 'sampled': attempted[stratum],
+                          'rate': attempted[stratum] / seen[stratum]}
+                for stratum in reservoirs
+            }
+        }
+        return files_data, report
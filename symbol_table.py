@@ -0,0 +1,319 @@
+import zlib
+import heapq
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, Iterator, List, Tuple, Any
+import numpy as np
+
+class StringPool:
+    """Pool de chaînes internées: octets contigus + offsets + table de hachage ouverte"""
+
+    def __init__(self):
+        self._data = bytearray()
+        self._offsets = array('I', [0])
+        self._table = array('i', [-1]) * 1024
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def _bytes(self, symbol_id: int) -> bytes:
+        return bytes(self._data[self._offsets[symbol_id]:self._offsets[symbol_id + 1]])
+
+    def _slot(self, raw: bytes) -> Tuple[int, int]:
+        """Retourne (position dans la table, identifiant ou -1)"""
+        mask = len(self._table) - 1
+        slot = zlib.crc32(raw) & mask
+        while True:
+            symbol_id = self._table[slot]
+            if symbol_id < 0 or self._bytes(symbol_id) == raw:
+                return slot, symbol_id
+            slot = (slot + 1) & mask
+
+    def _rehash(self):
+        self._table = array('i', [-1]) * (len(self._table) * 2)
+        mask = len(self._table) - 1
+        for symbol_id in range(len(self)):
+            slot = zlib.crc32(self._bytes(symbol_id)) & mask
+            while self._table[slot] >= 0:
+                slot = (slot + 1) & mask
+            self._table[slot] = symbol_id
+
+    def intern(self, symbol: str) -> int:
+        """Retourne l'identifiant de la chaîne, en l'ajoutant au besoin"""
+        raw = symbol.encode('utf-8', 'surrogatepass')
+        slot, symbol_id = self._slot(raw)
+        if symbol_id >= 0:
+            return symbol_id
+
+        symbol_id = len(self)
+        self._data += raw
+        self._offsets.append(len(self._data))
+        self._table[slot] = symbol_id
+        if len(self) * 4 > len(self._table) * 3:
+            self._rehash()
+        return symbol_id
+
+    def lookup(self, symbol: str) -> int:
+        """Retourne l'identifiant de la chaîne ou -1 si elle est absente"""
+        return self._slot(symbol.encode('utf-8', 'surrogatepass'))[1]
+
+    def get(self, symbol_id: int) -> str:
+        return self._bytes(symbol_id).decode('utf-8', 'surrogatepass')
+
+    def merge(self, other: 'StringPool') -> np.ndarray:
+        """Intègre un autre pool et retourne la table de correspondance de ses identifiants"""
+        return np.array([self.intern(other.get(i)) for i in range(len(other))], dtype=np.uint32)
+
+    def subset(self, symbol_ids: np.ndarray) -> Tuple['StringPool', np.ndarray]:
+        """Nouveau pool ne contenant que les identifiants donnés (triés, uniques)
+        
+        Retourne (pool, table ancien identifiant -> nouveau); l'ordre des identifiants est
+        conservé, les tableaux triés restent donc triés après conversion.
+        """
+        pool = StringPool()
+        remap = np.zeros(len(self), dtype=np.uint32)
+        for symbol_id in symbol_ids:
+            remap[symbol_id] = pool.intern(self.get(int(symbol_id)))
+        return pool, remap
+
+    def memory_size(self) -> int:
+        return (len(self._data) + self._offsets.itemsize * len(self._offsets)
+                + self._table.itemsize * len(self._table))
+
+    def __getstate__(self) -> Dict[str, bytes]:
+        return {
+            'data': bytes(self._data),
+            'offsets': self._offsets.tobytes(),
+            'table': self._table.tobytes()
+        }
+
+    def __setstate__(self, state: Dict[str, bytes]):
+        self._data = bytearray(state['data'])
+        self._offsets = array('I')
+        self._offsets.frombytes(state['offsets'])
+        self._table = array('i')
+        self._table.frombytes(state['table'])
+
+
+class SymbolSet:
+    """Ensemble de symboles stocké comme tableaux triés d'identifiants et d'occurrences"""
+
+    def __init__(self, pool: StringPool, symbols: Iterable[str] = ()):
+        self.pool = pool
+        self._ids = np.zeros(0, dtype=np.uint32)
+        self._counts = np.zeros(0, dtype=np.uint32)
+        self._pending = array('I')
+        self.update(symbols)
+
+    def _compact(self):
+        """Fusionne les ajouts en attente dans les tableaux triés"""
+        if not self._pending:
+            return
+
+        pending = np.frombuffer(self._pending, dtype=np.uint32)
+        ids = np.concatenate((self._ids, pending))
+        counts = np.concatenate((self._counts, np.ones(len(pending), dtype=np.uint32)))
+        self._ids, inverse = np.unique(ids, return_inverse=True)
+        self._counts = np.bincount(inverse.ravel(), weights=counts, minlength=len(self._ids)).astype(np.uint32)
+        self._pending = array('I')
+
+    def compact(self):
+        """Fusionne les ajouts en attente (à appeler avant des lectures concurrentes)"""
+        self._compact()
+
+    def add(self, symbol: str):
+        self._pending.append(self.pool.intern(symbol))
+        if len(self._pending) > max(4096, len(self._ids)):
+            self._compact()
+
+    def update(self, symbols: Iterable[str]):
+        for symbol in symbols:
+            self.add(symbol)
+
+    def add_ids(self, symbol_ids: np.ndarray):
+        """Ajoute une occurrence pour chaque identifiant déjà interné"""
+        self._pending.frombytes(np.asarray(symbol_ids, dtype=np.uint32).tobytes())
+        if len(self._pending) > max(4096, len(self._ids)):
+            self._compact()
+
+    def subtract_ids(self, symbol_ids: np.ndarray):
+        """Retire une occurrence par identifiant; les symboles à zéro disparaissent"""
+        self._compact()
+        removed_ids, removed_counts = np.unique(np.asarray(symbol_ids, dtype=np.uint32), return_counts=True)
+        positions = np.searchsorted(self._ids, removed_ids)
+        found = positions < len(self._ids)
+        found[found] = self._ids[positions[found]] == removed_ids[found]
+        positions = positions[found]
+
+        counts = self._counts.astype(np.int64)
+        counts[positions] -= removed_counts[found]
+        keep = counts > 0
+        self._ids = self._ids[keep]
+        self._counts = counts[keep].astype(np.uint32)
+
+    def __contains__(self, symbol: str) -> bool:
+        symbol_id = self.pool.lookup(symbol)
+        if symbol_id < 0:
+            return False
+        self._compact()
+        position = np.searchsorted(self._ids, symbol_id)
+        return position < len(self._ids) and self._ids[position] == symbol_id
+
+    def __len__(self) -> int:
+        self._compact()
+        return len(self._ids)
+
+    def __iter__(self) -> Iterator[str]:
+        self._compact()
+        for symbol_id in self._ids:
+            yield self.pool.get(int(symbol_id))
+
+    def count(self, symbol: str) -> int:
+        """Nombre d'occurrences apprises pour un symbole"""
+        symbol_id = self.pool.lookup(symbol)
+        if symbol_id < 0:
+            return 0
+        self._compact()
+        position = np.searchsorted(self._ids, symbol_id)
+        if position < len(self._ids) and self._ids[position] == symbol_id:
+            return int(self._counts[position])
+        return 0
+
+    def most_common(self, n: int) -> List[Tuple[str, int]]:
+        """Retourne les n symboles les plus fréquents"""
+        self._compact()
+        if n <= 0 or not len(self._ids):
+            return []
+        if n < len(self._ids):
+            top = np.argpartition(-self._counts.astype(np.int64), n)[:n]
+        else:
+            top = np.arange(len(self._ids))
+        top = top[np.lexsort((self._ids[top], -self._counts[top].astype(np.int64)))]
+        return [(self.pool.get(int(self._ids[i])), int(self._counts[i])) for i in top]
+
+    def truncate(self, n: int):
+        """Ne conserve que les n symboles les plus fréquents"""
+        self._compact()
+        if len(self._ids) <= n:
+            return
+        keep = np.sort(np.argpartition(-self._counts.astype(np.int64), n)[:n])
+        self._ids = self._ids[keep]
+        self._counts = self._counts[keep]
+
+    def merge(self, other: 'SymbolSet', remap: np.ndarray = None):
+        """Ajoute les symboles et occurrences d'un autre ensemble"""
+        self._compact()
+        other._compact()
+        other_ids = other._ids if remap is None else remap[other._ids]
+        ids = np.concatenate((self._ids, other_ids))
+        counts = np.concatenate((self._counts, other._counts))
+        self._ids, inverse = np.unique(ids, return_inverse=True)
+        self._counts = np.bincount(inverse.ravel(), weights=counts, minlength=len(self._ids)).astype(np.uint32)
+
+    def difference(self, other: 'SymbolSet') -> 'SymbolSet':
+        """Symboles (avec occurrences) présents ici mais absents de l'autre ensemble"""
+        self._compact()
+        other._compact()
+        if other.pool is self.pool:
+            other_ids = self._ids
+        else:
+            other_ids = np.array([other.pool.lookup(self.pool.get(int(i))) for i in self._ids], dtype=np.int64)
+        missing = ~np.isin(other_ids, other._ids.astype(np.int64))
+
+        result = SymbolSet(self.pool)
+        result._ids = self._ids[missing]
+        result._counts = self._counts[missing]
+        return result
+    
+    def rebase(self, pool: StringPool, remap: np.ndarray):
+        """Passe sur un autre pool (voir StringPool.subset) en convertissant les identifiants"""
+        self._compact()
+        self._ids = remap[self._ids]
+        self.pool = pool
+
+    def memory_size(self) -> int:
+        return self._ids.nbytes + self._counts.nbytes + self._pending.itemsize * len(self._pending)
+
+    def to_state(self) -> Dict[str, np.ndarray]:
+        """État sérialisable (tableaux numpy, sans objets Python par symbole)"""
+        self._compact()
+        return {'ids': self._ids, 'counts': self._counts}
+
+    @classmethod
+    def from_state(cls, pool: StringPool, state: Dict[str, Any]) -> 'SymbolSet':
+        symbol_set = cls(pool)
+        symbol_set._ids = np.asarray(state['ids'], dtype=np.uint32)
+        symbol_set._counts = np.asarray(state['counts'], dtype=np.uint32)
+        return symbol_set
+
+
+class PrefixIndex:
+    """Index de complétion par préfixe, classé par fréquence
+
+    Trie implicite: les symboles triés forment les feuilles du trie dans l'ordre, chaque
+    préfixe correspond donc à un intervalle trouvé par dichotomie. Une table creuse
+    (sparse table) donne le plus fréquent de tout intervalle en O(1), ce qui permet
+    d'extraire les k meilleurs sans parcourir l'intervalle.
+    """
+
+    def __init__(self, symbols: List[str], counts: np.ndarray):
+        order = sorted(range(len(symbols)), key=symbols.__getitem__)
+        self.symbols = [symbols[i] for i in order]
+        self.counts = np.asarray(counts, dtype=np.int64)[order]
+
+        # _table[j][i]: position du symbole le plus fréquent de [i, i + 2**j)
+        self._table = [np.arange(len(self.symbols), dtype=np.int32)]
+        span = 1
+        while span * 2 <= len(self.symbols):
+            previous = self._table[-1]
+            left, right = previous[:-span], previous[span:]
+            self._table.append(np.where(self.counts[right] > self.counts[left], right, left))
+            span *= 2
+
+    @classmethod
+    def from_symbol_sets(cls, pool: StringPool, symbol_sets: Iterable[SymbolSet]) -> 'PrefixIndex':
+        """Construit l'index à partir d'ensembles partageant le même pool (occurrences cumulées)"""
+        return cls.from_states(pool, [symbol_set.to_state() for symbol_set in symbol_sets])
+
+    @classmethod
+    def from_states(cls, pool: StringPool, states: List[Dict[str, np.ndarray]]) -> 'PrefixIndex':
+        """Construit l'index à partir d'états d'ensembles (voir SymbolSet.to_state) déjà copiés"""
+        ids = np.concatenate([state['ids'] for state in states] or [np.zeros(0, dtype=np.uint32)])
+        counts = np.concatenate([state['counts'] for state in states] or [np.zeros(0, dtype=np.uint32)])
+        unique_ids, inverse = np.unique(ids, return_inverse=True)
+        totals = np.bincount(inverse.ravel(), weights=counts, minlength=len(unique_ids)).astype(np.int64)
+        return cls([pool.get(int(symbol_id)) for symbol_id in unique_ids], totals)
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def _best(self, start: int, stop: int) -> int:
+        """Position du symbole le plus fréquent de [start, stop) (le premier en cas d'égalité)"""
+        level = (stop - start).bit_length() - 1
+        left = int(self._table[level][start])
+        right = int(self._table[level][stop - (1 << level)])
+        return right if self.counts[right] > self.counts[left] else left
+
+    def prefix_range(self, prefix: str) -> Tuple[int, int]:
+        start = bisect_left(self.symbols, prefix)
+        stop = bisect_left(self.symbols, prefix + '\U0010ffff', start)
+        return start, stop
+
+    def complete(self, prefix: str, k: int = 10) -> List[Tuple[str, int]]:
+        """Les k symboles les plus fréquents commençant par prefix"""
+        start, stop = self.prefix_range(prefix)
+        results = []
+        candidates = []
+        if start < stop:
+            best = self._best(start, stop)
+            candidates.append((-int(self.counts[best]), best, start, stop))
+
+        # Chaque intervalle extrait est coupé en deux autour de son meilleur symbole
+        while candidates and len(results) < k:
+            negative_count, best, start, stop = heapq.heappop(candidates)
+            results.append((self.symbols[best], -negative_count))
+            for sub_start, sub_stop in ((start, best), (best + 1, stop)):
+                if sub_start < sub_stop:
+                    sub_best = self._best(sub_start, sub_stop)
+                    heapq.heappush(candidates, (-int(self.counts[sub_best]), sub_best, sub_start, sub_stop))
+        return results
@@ -0,0 +1,13 @@
+import os
+import sys
+
+import pytest
+
+# Les modules de l'application sont à la racine du dépôt
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(autouse=True)
+def working_directory(tmp_path, monkeypatch):
+    """L'historique d'entraînement est écrit dans le dossier courant: l'isoler par test"""
+    monkeypatch.chdir(tmp_path)
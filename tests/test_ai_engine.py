@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+
+from ai_engine import AIEngine
+
+SOURCE = 'import os\n\nclass Loader:\n    pass\n\ndef load():\n    return os.getcwd()\n'
+
+
+def test_forget_after_compaction_removes_the_learned_symbols():
+    engine = AIEngine(None)
+    engine.learn_from_code('def other():\n    pass\n', 'other.py')
+    contribution = engine.learn_from_code(SOURCE, 'loader.py')
+    engine.forget_contribution(engine.learn_from_code('def dropped():\n    pass\n', 'dropped.py'))
+    engine.compact_symbol_pool()
+
+    engine.forget_contribution(contribution)
+    functions = engine.knowledge_base['python']['functions']
+    assert functions.count('load') == 0
+    assert functions.count('other') == 1
+
+
+def test_symbol_id_contributions_are_rejected():
+    engine = AIEngine(None)
+    contribution = engine.learn_from_code(SOURCE, 'loader.py')
+    contribution['functions'] = np.array([0], dtype=np.uint32)
+    with pytest.raises(ValueError):
+        engine.forget_contribution(contribution)
+    assert engine.knowledge_base['python']['functions'].count('load') == 1
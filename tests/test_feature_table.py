@@ -0,0 +1,42 @@
+import json
+import os
+
+from feature_table import FeatureTable, FeatureTableWriter
+
+FILE_DATA = {'path': '/corpus/a.py', 'size': 120, 'line_count': 12, 'language': 'python',
+             'extension': '.py', 'is_code': True}
+FEATURES = {'lines_count': 10, 'complexity_score': 3, 'functions': ['f', 'g'], 'classes': [],
+            'imports': ['os'], 'variables': [], 'comments': [], 'language': 'python',
+            'language_confidence': 0.9}
+
+
+def write_table(path):
+    with FeatureTableWriter(str(path)) as writer:
+        writer.append(FILE_DATA, FEATURES)
+        writer.append(dict(FILE_DATA, path='/corpus/b.txt', is_code=False), None, 'not_code')
+
+
+def test_file_lines_and_analyzed_lines_are_distinct_columns(tmp_path):
+    write_table(tmp_path)
+    table = FeatureTable(str(tmp_path))
+    assert 'lines_count' not in table.column_names
+    assert list(table['line_count']) == [12, 12]
+    assert list(table['analyzed_lines']) == [10, 0]
+    assert list(table['functions']) == [2, 0]
+    assert table.path(1) == '/corpus/b.txt'
+
+
+def test_version_1_tables_expose_the_renamed_column(tmp_path):
+    write_table(tmp_path)
+    # Table écrite avant le renommage: colonne 'lines_count', manifeste en version 1
+    os.rename(tmp_path / 'analyzed_lines.bin', tmp_path / 'lines_count.bin')
+    manifest_path = tmp_path / 'manifest.json'
+    manifest = json.loads(manifest_path.read_text(encoding='utf-8'))
+    manifest['version'] = 1
+    manifest['columns'] = {('lines_count' if name == 'analyzed_lines' else name): dtype
+                           for name, dtype in manifest['columns'].items()}
+    manifest_path.write_text(json.dumps(manifest), encoding='utf-8')
+
+    table = FeatureTable(str(tmp_path))
+    assert 'analyzed_lines' in table.column_names
+    assert list(table['analyzed_lines']) == [10, 0]
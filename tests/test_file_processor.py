@@ -0,0 +1,99 @@
+import threading
+
+from file_processor import FileProcessor, FileStatsAccumulator
+
+LONG_STRING = 'x' * 5000
+
+
+def write(tmp_path, name, content):
+    path = tmp_path / name
+    path.write_text(content, encoding='utf-8')
+    return str(path)
+
+
+def test_html_page_with_one_long_line_is_analyzed(tmp_path):
+    processor = FileProcessor()
+    content = '<!DOCTYPE html>\n<html>\n<body>\n' + f'<p>{LONG_STRING}</p>\n' + '</body>\n</html>\n'
+    file_data = processor.process_file(write(tmp_path, 'page.html', content))
+    assert file_data is not None
+    assert file_data['content_flag'] is None
+
+
+def test_shell_script_with_one_long_line_is_analyzed(tmp_path):
+    processor = FileProcessor()
+    content = '#!/bin/sh\nset -e\n' + f'echo "{LONG_STRING}"\n' + 'exit 0\n'
+    file_data = processor.process_file(write(tmp_path, 'build.sh', content))
+    assert file_data is not None
+    assert file_data['content_flag'] is None
+
+
+def test_typescript_with_one_embedded_string_is_analyzed(tmp_path):
+    processor = FileProcessor()
+    content = ('export function render(): string {\n'
+               f'    const template = "{LONG_STRING}";\n'
+               '    return template;\n'
+               '}\n')
+    file_data = processor.process_file(write(tmp_path, 'render.ts', content))
+    assert file_data is not None
+    assert file_data['content_flag'] is None
+
+
+def test_javascript_with_one_long_line_among_many_is_analyzed():
+    processor = FileProcessor()
+    content = '\n'.join(['function f() {', f'  return "{LONG_STRING}";', '}'] + ['// commentaire'] * 20)
+    assert processor.classify_content('app.js', content.encode('utf-8')) is None
+
+
+def test_minified_javascript_is_detected():
+    processor = FileProcessor()
+    bundle = '/*! licence */\n' + 'var a=function(b){return b+1};' * 400
+    assert processor.classify_content('bundle.js', bundle.encode('utf-8')) == 'minified'
+
+
+def test_mostly_long_lines_css_is_detected():
+    processor = FileProcessor()
+    rule = '.a{color:red}' * 60
+    stylesheet = '\n'.join([rule] * 4 + ['.b{color:blue}'])
+    assert processor.classify_content('site.css', stylesheet.encode('utf-8')) == 'minified'
+
+
+def test_free_text_do_not_edit_note_is_not_generated():
+    processor = FileProcessor()
+    sample = b'# Please do not edit lines below without review\nimport os\n'
+    assert processor.classify_content('ok.py', sample) is None
+
+
+def test_go_generated_header_is_detected():
+    processor = FileProcessor()
+    sample = b'// Code generated by protoc-gen-go. DO NOT EDIT.\npackage api\n'
+    assert processor.classify_content('api.go', sample) == 'generated'
+
+
+def stats_with_files(count):
+    stats = FileStatsAccumulator()
+    for i in range(count):
+        stats.add({'path': f'f{i}.py', 'size': i + 1, 'line_count': i + 1, 'is_code': True,
+                   'language': 'python', 'extension': '.py', 'content': ''})
+    return stats
+
+
+def test_merging_an_accumulator_into_itself_is_a_no_op():
+    stats = stats_with_files(3)
+    stats.merge(stats)
+    assert stats.get_stats()['total_files'] == 3
+
+
+def test_concurrent_cross_merges_do_not_deadlock():
+    first, second = stats_with_files(2), stats_with_files(2)
+
+    def merge_many(target, source):
+        for _ in range(2000):
+            target.merge(source)
+
+    threads = [threading.Thread(target=merge_many, args=pair, daemon=True)
+               for pair in ((first, second), (second, first))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=30)
+    assert not any(thread.is_alive() for thread in threads)
@@ -0,0 +1,34 @@
+from ai_engine import AIEngine
+from guarded_analysis import GuardedAnalyzer
+from training_manager import TrainingManager
+
+SMALL_SOURCE = 'import os\n\ndef main():\n    return os.getcwd()\n'
+
+
+def test_small_files_are_analyzed_in_process():
+    with GuardedAnalyzer(AIEngine(None), time_budget=5.0) as guard:
+        features, status = guard.extract(SMALL_SOURCE)
+        assert status == GuardedAnalyzer.OK
+        assert features['functions'] == ['main']
+        assert guard._process is None
+
+
+def test_large_files_go_through_the_worker():
+    large_source = SMALL_SOURCE * 5000
+    with GuardedAnalyzer(AIEngine(None), time_budget=30.0) as guard:
+        features, status = guard.extract(large_source)
+        assert status == GuardedAnalyzer.OK
+        assert guard._process is not None
+        assert features['lines_count'] == large_source.count('\n') + 1
+
+
+def test_long_lines_are_not_analyzed_in_process():
+    guard = GuardedAnalyzer(AIEngine(None))
+    assert not guard.is_cheap('x = "' + 'a' * 1000 + '"\n')
+    assert guard.is_cheap(SMALL_SOURCE)
+
+
+def test_time_budget_is_a_constructor_parameter():
+    manager = TrainingManager(AIEngine(None), time_budget=10.0)
+    assert manager.time_budget == 10.0
+    assert TrainingManager(AIEngine(None)).time_budget is None
@@ -0,0 +1,52 @@
+import os
+import zipfile
+
+from ai_engine import AIEngine
+from file_processor import FileProcessor
+from knowledge_watcher import KnowledgeWatcher
+from training_manager import TrainingManager
+
+MEMBER_SOURCE = 'def archived_helper():\n    return 1\n'
+
+
+def make_folder(tmp_path):
+    folder = tmp_path / 'projet'
+    folder.mkdir()
+    (folder / 'main.py').write_text('def main():\n    return 0\n', encoding='utf-8')
+    with zipfile.ZipFile(folder / 'vendored.zip', 'w') as archive:
+        archive.writestr('lib/helper.py', MEMBER_SOURCE)
+    return folder
+
+
+def function_count(engine, name):
+    return engine.knowledge_base['python']['functions'].count(name)
+
+
+def test_archive_member_contributions_are_forgotten_with_the_archive(tmp_path):
+    folder = make_folder(tmp_path)
+    engine = AIEngine(None)
+    processor = FileProcessor()
+    contributions = {}
+    TrainingManager(engine).train(processor.process_directory(str(folder)), contributions=contributions)
+    assert str(folder / 'vendored.zip') in contributions
+    assert function_count(engine, 'archived_helper') == 1
+
+    watcher = KnowledgeWatcher(engine, str(folder), processor, index_path=str(tmp_path / 'index.pkl'))
+    watcher.seed_index(contributions)
+    os.remove(folder / 'vendored.zip')
+    summary = watcher.apply_changes([str(folder / 'vendored.zip')])
+
+    assert summary['removed'] == 1
+    assert function_count(engine, 'archived_helper') == 0
+
+
+def test_sampled_training_seeds_the_watch_index(tmp_path):
+    folder = make_folder(tmp_path)
+    engine = AIEngine(None)
+    contributions = {}
+    TrainingManager(engine).train_sample(str(folder), contributions=contributions)
+
+    watcher = KnowledgeWatcher(engine, str(folder), index_path=str(tmp_path / 'index.pkl'))
+    watcher.seed_index(contributions)
+    assert watcher.sync() == {'updated': 0, 'removed': 0}
+    assert function_count(engine, 'main') == 1
@@ -0,0 +1,52 @@
+import stratified_sampler
+from ai_engine import AIEngine
+from stratified_sampler import StratifiedSampler
+from training_manager import TrainingManager
+
+
+class SteppingClock:
+    """Horloge factice: l'échéance du parcours tombe après le premier dossier"""
+
+    def __init__(self, walk_directories_in_time: int):
+        self.calls = 0
+        self.walk_directories_in_time = walk_directories_in_time
+
+    def time(self) -> float:
+        self.calls += 1
+        # Deux appels pour les échéances, puis un par dossier parcouru
+        return 0.0 if self.calls <= 2 + self.walk_directories_in_time else 6.0
+
+
+def make_corpus(tmp_path):
+    root = tmp_path / 'corpus'
+    (root / 'sous_dossier').mkdir(parents=True)
+    for i in range(3):
+        (root / f'module_{i}.py').write_text(f'def f{i}():\n    return {i}\n', encoding='utf-8')
+        (root / 'sous_dossier' / f'autre_{i}.py').write_text('def g():\n    return 0\n', encoding='utf-8')
+    return root
+
+
+def test_complete_walk_extrapolates(tmp_path):
+    files_data, report = StratifiedSampler(seed=1).sample_directory(str(make_corpus(tmp_path)))
+    assert not report['walk_truncated']
+    assert report['estimates'] == 'extrapolated'
+    assert report['files_seen'] == 6
+
+
+def test_truncated_walk_reports_lower_bound_estimates(tmp_path, monkeypatch):
+    monkeypatch.setattr(stratified_sampler, 'time', SteppingClock(walk_directories_in_time=1))
+    sampler = StratifiedSampler(time_limit=10, seed=1)
+    files_data, report = sampler.sample_directory(str(make_corpus(tmp_path)))
+
+    assert report['walk_truncated']
+    assert report['estimates'] == 'lower_bound'
+    # Seul le premier dossier a été parcouru puis lu
+    assert report['files_seen'] == 3
+    assert len(files_data) == 3
+
+
+def test_training_stats_flag_lower_bound_corpus_estimate(tmp_path, monkeypatch):
+    monkeypatch.setattr(stratified_sampler, 'time', SteppingClock(walk_directories_in_time=1))
+    manager = TrainingManager(AIEngine(None))
+    manager.train_sample(str(make_corpus(tmp_path)), time_limit=10)
+    assert manager.get_training_stats()['estimated_corpus_files_is_lower_bound']
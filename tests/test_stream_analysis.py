@@ -0,0 +1,55 @@
+import io
+import tracemalloc
+
+from ai_engine import AIEngine
+
+SOURCE = '''import os
+
+class Loader:
+    def load(self, path):
+        # lecture du fichier
+        with open(path) as f:
+            return f.read()
+
+def main():
+    x = Loader()
+    return x.load("a.txt")
+'''
+
+
+def test_stream_counts_match_in_memory_analysis():
+    engine = AIEngine(None)
+    features = engine.extract_stream_features(io.StringIO(SOURCE))
+    reference = engine.extract_code_features(SOURCE)
+    assert features['lines_count'] == reference['lines_count']
+    assert features['functions'] == reference['functions']
+    assert features['classes'] == reference['classes']
+    assert features['language'] == reference['language']
+
+
+def test_overlong_lines_are_split_without_changing_line_counts():
+    engine = AIEngine(None)
+    engine.stream_segment_size = 16
+    features = engine.extract_stream_features(['x' * 200 + '\n', 'def f():\n', 'y' * 150])
+    assert features['lines_count'] == 3
+    assert features['long_lines_count'] == 2
+    assert features['functions'] == ['f']
+
+
+def test_single_huge_line_is_analyzed_in_bounded_memory(tmp_path):
+    engine = AIEngine(None)
+    path = tmp_path / 'huge.js'
+    line_size = 8 * 1024 * 1024
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('0123456789' * (line_size // 10))
+
+    tracemalloc.start()
+    try:
+        report = engine.analyze_file(str(path))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert 'Nombre de lignes: 1' in report
+    # Blocs d'analyse (1 Mo) et préfixe de détection, jamais la ligne entière
+    assert peak < line_size // 2
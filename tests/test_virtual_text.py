@@ -0,0 +1,43 @@
+import mmap
+
+from virtual_text import LineIndex
+
+
+def build_index(tmp_path, content: bytes, chunk_size: int):
+    path = tmp_path / 'big.txt'
+    path.write_bytes(content)
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        index = LineIndex(data, chunk_size=chunk_size)
+        index.build()
+        lines = [bytes(data[slice(*index.span(i, i + 1))]) for i in range(index.line_count)]
+    return index, lines
+
+
+def test_chunked_index_matches_line_split(tmp_path):
+    content = b''.join(b'ligne %d %s\n' % (i, b'x' * (i % 37)) for i in range(5000)) + b'fin'
+    index, lines = build_index(tmp_path, content, chunk_size=4096)
+    assert index.complete
+    assert lines == [line + b'\n' for line in content.split(b'\n')[:-1]] + [b'fin']
+
+
+def test_final_newline_does_not_add_an_empty_line(tmp_path):
+    index, lines = build_index(tmp_path, b'a\nb\nc\n', chunk_size=2)
+    assert index.line_count == 3
+    assert lines == [b'a\n', b'b\n', b'c\n']
+
+
+def test_lines_are_readable_while_indexing():
+    data = b'0123456789\n' * 100
+    index = LineIndex(data, chunk_size=len(data))
+    # Avant l'indexation, seule la première ligne est commencée (fin inconnue)
+    assert index.line_count == 0
+    assert index.span(0, 10) == (0, 0)
+    index.build()
+    assert index.line_count == 100
+    assert index.span(98, 200) == (98 * 11, 100 * 11)
+
+
+def test_empty_file_has_no_lines():
+    index = LineIndex(b'')
+    index.build()
+    assert index.complete and index.line_count == 0
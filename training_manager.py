@@ -1,29 +1,103 @@
-from typing import List, Dict, Any, Callable
+from typing import List, Dict, Any, Callable, Optional
+import os
 import json
 import time
+import zlib
 from ai_engine import AIEngine
+from file_processor import FileProcessor, FileStatsAccumulator
+from git_source import GitSource
+from guarded_analysis import GuardedAnalyzer
+from feature_table import FeatureTableWriter
+from stratified_sampler import StratifiedSampler
 
 class TrainingManager:
-    def __init__(self, ai_engine: AIEngine):
+    def __init__(self, ai_engine: AIEngine, time_budget: Optional[float] = None):
+        """time_budget: budget de temps par fichier (secondes); None pour analyser sans garde"""
         self.ai_engine = ai_engine
         self.training_history = []
+        self.time_budget = time_budget
+        # Dossier de la table colonnaire des caractéristiques par fichier; None pour ne pas l'écrire
+        self.feature_table_path = None
+        # Un fichier sur holdout_modulo (selon son chemin) sert uniquement à évaluer la détection de langage
+        self.holdout_modulo = 10
+        self.max_holdout_files = 2000
     
-    def train(self, files_data: List[Dict[str, Any]], progress_callback: Callable[[float], None] = None):
-        """Entraîne l'IA avec les données des fichiers"""
+    def train(self, files_data: List[Dict[str, Any]], progress_callback: Callable[[float], None] = None,
+              file_stats: FileStatsAccumulator = None, time_budget: float = None,
+              sampling_report: Dict[str, Any] = None, feature_table_path: str = None,
+              contributions: Dict[str, Dict[str, Any]] = None):
+        """Entraîne l'IA avec les données des fichiers
+        
+        file_stats: statistiques déjà accumulées pendant l'ingestion; sinon elles sont
+        calculées pendant la phase d'apprentissage.
+        time_budget: budget par fichier (secondes), par défaut self.time_budget. Les fichiers
+        qui le dépassent sont analysés de façon bornée (dégradés) ou ignorés.
+        sampling_report: rapport de StratifiedSampler, enregistré dans l'historique; le taux
+        'sampling_rate' de chaque fichier pondère les compteurs estimés de la base.
+        feature_table_path: dossier où écrire la table des caractéristiques par fichier
+        (voir feature_table.py), par défaut self.feature_table_path.
+        contributions: dictionnaire rempli avec les contributions des fichiers appris (chemin
+        sur disque -> liste de contributions), pour initialiser l'index du mode surveillance.
+        Les membres d'une archive sont rattachés au chemin de l'archive qui les contient.
+        """
         if not files_data:
             raise ValueError("Aucune donnée de fichier fournie pour l'entraînement")
         
         total_files = len(files_data)
         start_time = time.time()
         
+        # Phase 0: Classifieur de langage entraîné sur les étiquettes issues des extensions
+        language_detection = self.train_language_classifier(files_data)
+        
+        collect_stats = file_stats is None
+        if collect_stats:
+            file_stats = FileStatsAccumulator()
+        
+        if time_budget is None:
+            time_budget = self.time_budget
+        guard = GuardedAnalyzer(self.ai_engine, time_budget) if time_budget else None
+        degraded_files, skipped_files = [], []
+        
+        if feature_table_path is None:
+            feature_table_path = self.feature_table_path
+        feature_table = FeatureTableWriter(feature_table_path) if feature_table_path else None
+        
         # Phase 1: Apprentissage des patterns (50-80%)
-        for i, file_data in enumerate(files_data):
-            if file_data['is_code'] and file_data['content']:
-                self.ai_engine.learn_from_code(file_data['content'], file_data['path'])
-            
-            if progress_callback:
-                progress = 50 + (i / total_files) * 30  # 50% à 80%
-                progress_callback(progress)
+        try:
+            for i, file_data in enumerate(files_data):
+                if collect_stats:
+                    file_stats.add(file_data)
+                
+                features, status = None, 'not_code'
+                # Les fichiers signalés (minifiés, générés...) comptent dans les statistiques seulement
+                if file_data.get('content_flag'):
+                    status = 'flagged'
+                elif file_data['is_code'] and file_data['content']:
+                    if guard is None:
+                        features, status = self.ai_engine.extract_code_features(file_data['content']), GuardedAnalyzer.OK
+                    else:
+                        features, status = guard.extract(file_data['content'])
+                        if status == GuardedAnalyzer.DEGRADED:
+                            degraded_files.append(file_data['path'])
+                        elif status == GuardedAnalyzer.SKIPPED:
+                            skipped_files.append(file_data['path'])
+                    if features is not None:
+                        contribution = self.ai_engine.learn_from_features(features, file_data.get('sampling_rate', 1.0))
+                        if contributions is not None:
+                            path = file_data.get('archive', file_data['path'])
+                            contributions.setdefault(path, []).append(contribution)
+                
+                if feature_table is not None:
+                    feature_table.append(file_data, features, status)
+                
+                if progress_callback:
+                    progress = 50 + (i / total_files) * 30  # 50% à 80%
+                    progress_callback(progress)
+        finally:
+            if guard is not None:
+                guard.close()
+            if feature_table is not None:
+                feature_table.close()
         
         # Phase 2: Optimisation de la base de connaissances (80-90%)
         if progress_callback:
@@ -38,13 +112,21 @@ class TrainingManager:
         self.ai_engine.save_knowledge_base()
         
         # Enregistrement de l'historique d'entraînement
+        stats = file_stats.get_stats()
         training_session = {
             'timestamp': time.time(),
             'duration': time.time() - start_time,
             'files_processed': total_files,
-            'code_files': sum(1 for f in files_data if f['is_code']),
+            'code_files': stats['code_files'],
             'languages_learned': list(self.ai_engine.knowledge_base.keys()),
-            'total_lines': sum(f['line_count'] for f in files_data if f['is_code'])
+            'total_lines': stats['code_lines'],
+            'file_languages': stats['languages'],
+            'skipped_generated': stats['skipped'],
+            'degraded_files': degraded_files,
+            'skipped_files': skipped_files,
+            'sampling': sampling_report,
+            'language_detection': language_detection,
+            'feature_table': feature_table_path
         }
         
         self.training_history.append(training_session)
@@ -53,24 +135,102 @@ class TrainingManager:
         if progress_callback:
             progress_callback(100)
     
+    def train_git_revision(self, repo_path: str, revision: str = 'HEAD',
+                           progress_callback: Callable[[float], None] = None) -> int:
+        """Entraîne sur une révision d'un dépôt Git sans checkout
+        
+        Les blobs déjà appris (mêmes OID) lors d'entraînements précédents sont ignorés.
+        Retourne le nombre de fichiers nouvellement appris.
+        """
+        oid_index_path = None
+        if self.ai_engine.knowledge_base_path is not None:
+            oid_index_path = os.path.join(os.path.dirname(self.ai_engine.knowledge_base_path), 'git_oids.pkl')
+        
+        with GitSource(repo_path, oid_index_path=oid_index_path,
+                       knowledge_base_id=self.ai_engine.knowledge_base_id) as source:
+            file_stats = FileStatsAccumulator()
+            files_data = source.process_revision(revision, progress_callback, stats=file_stats)
+            if files_data:
+                self.train(files_data, progress_callback, file_stats=file_stats)
+            source.mark_learned(files_data)
+            source.save_oid_index()
+        
+        return len(files_data)
+    
+    def train_sample(self, directory_path: str, target_files: int = 10000, byte_budget: int = None,
+                     time_limit: float = None, progress_callback: Callable[[float], None] = None,
+                     file_processor: FileProcessor = None,
+                     contributions: Dict[str, List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """Entraînement exploratoire sur un échantillon stratifié d'un très gros dossier
+        
+        S'arrête au premier des critères atteint: nombre de fichiers, octets lus ou durée
+        (secondes, parcours et lecture compris). Retourne le rapport d'échantillonnage.
+        contributions: voir train().
+        """
+        sampler = StratifiedSampler(file_processor, target_files, byte_budget, time_limit)
+        file_stats = FileStatsAccumulator()
+        files_data, report = sampler.sample_directory(directory_path, progress_callback, stats=file_stats)
+        if files_data:
+            self.train(files_data, progress_callback, file_stats=file_stats, sampling_report=report,
+                       contributions=contributions)
+        return report
+    
+    def train_language_classifier(self, files_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Entraîne le classifieur statistique à partir des langages déduits des extensions
+        
+        Les fichiers mis de côté (toujours les mêmes, d'après le hachage du chemin) ne sont
+        jamais appris: ils mesurent la précision du classifieur face au vote par motifs.
+        Retourne cette évaluation, ou None sans fichier mis de côté.
+        """
+        file_processor = FileProcessor()
+        codes, labels = [], []
+        holdout_codes, holdout_labels = [], []
+        
+        for file_data in files_data:
+            if not file_data['is_code'] or not file_data['content'] or file_data.get('content_flag'):
+                continue
+            
+            # Contenu vide: seule l'extension ou le nom de fichier détermine l'étiquette
+            label = file_processor.detect_file_language(file_data['extension'], file_data['name'], '')
+            if label == 'unknown':
+                continue
+            if zlib.crc32(file_data['path'].encode('utf-8', 'surrogateescape')) % self.holdout_modulo == 0:
+                if len(holdout_codes) < self.max_holdout_files:
+                    holdout_codes.append(file_data['content'])
+                    holdout_labels.append(label)
+            else:
+                codes.append(file_data['content'])
+                labels.append(label)
+        
+        if codes:
+            try:
+                self.ai_engine.train_language_classifier(codes, labels)
+            except Exception as e:
+                print(f"Erreur lors de l'entraînement du classifieur: {e}")
+        
+        if not holdout_codes:
+            return None
+        return self.ai_engine.evaluate_language_detection(holdout_codes, holdout_labels)
+    
     def optimize_knowledge_base(self):
         """Optimise la base de connaissances après l'entraînement"""
-        for language in self.ai_engine.knowledge_base:
-            kb = self.ai_engine.knowledge_base[language]
-            
-            # Limiter le nombre d'éléments stockés pour éviter la surcharge mémoire
-            if len(kb['functions']) > 1000:
-                # Garder les plus fréquents (simulation)
-                kb['functions'] = set(list(kb['functions'])[:1000])
-            
-            if len(kb['classes']) > 500:
-                kb['classes'] = set(list(kb['classes'])[:500])
+        with self.ai_engine.lock:
+            for language in self.ai_engine.knowledge_base:
+                kb = self.ai_engine.knowledge_base[language]
+                
+                # Limiter le nombre d'éléments stockés en gardant les plus fréquents
+                kb['functions'].truncate(1000)
+                kb['classes'].truncate(500)
+                kb['imports'].truncate(200)
+                self.ai_engine.mark_language_dirty(language)
             
-            if len(kb['imports']) > 200:
-                kb['imports'] = set(list(kb['imports'])[:200])
-            
-            # Mettre à jour les patterns courants
-            self.ai_engine.update_common_patterns(language)
+            # Patterns courants et recommandations calculés une seule fois, en fin d'entraînement
+            self.ai_engine.materialize_recommendations()
+            # Les symboles retirés par la troncature quittent aussi le pool de chaînes
+            self.ai_engine.compact_symbol_pool()
+        
+        # Index de complétion reconstruits hors du verrou, une fois par entraînement
+        self.ai_engine.rebuild_completion_indexes()
     
     def get_training_stats(self) -> Dict[str, Any]:
         """Retourne les statistiques d'entraînement"""
@@ -87,6 +247,16 @@ class TrainingManager:
             'total_files_processed': total_files,
             'total_training_time': total_duration,
             'latest_session': latest_session,
+            'degraded_files': len(latest_session.get('degraded_files', [])),
+            'skipped_files': len(latest_session.get('skipped_files', [])),
+            'skipped_generated': sum(latest_session.get('skipped_generated', {}).values()),
+            'sampled': latest_session.get('sampling') is not None,
+            'language_detection': latest_session.get('language_detection'),
+            'estimated_corpus_files': sum(kb.get('estimated_file_count', kb.get('file_count', 0))
+                                          for kb in self.ai_engine.knowledge_base.values()),
+            # Échantillon tiré d'un parcours interrompu: le corpus réel est au moins aussi grand
+            'estimated_corpus_files_is_lower_bound':
+                (latest_session.get('sampling') or {}).get('estimates') == 'lower_bound',
             'languages_in_kb': len(self.ai_engine.knowledge_base),
             'knowledge_base_size': sum(
                 len(kb.get('functions', [])) + len(kb.get('classes', [])) + len(kb.get('imports', []))
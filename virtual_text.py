@@ -0,0 +1,230 @@
+import mmap
+import threading
+import tkinter as tk
+from bisect import bisect_right
+from tkinter import ttk
+import numpy as np
+
+class LineIndex:
+    """Débuts de ligne d'un fichier mappé, calculés par blocs de taille fixe
+
+    build() tourne dans un thread: la mémoire de travail est bornée par un bloc et les
+    lignes déjà indexées sont consultables pendant le calcul. Un retour à la ligne final
+    ne crée pas de ligne vide supplémentaire.
+    """
+
+    def __init__(self, data, chunk_size: int = 16 * 1024 * 1024):
+        self._data = data
+        self.size = len(data) if data is not None else 0
+        self.chunk_size = chunk_size
+        # Débuts de ligne par bloc, et numéro de la première ligne de chaque bloc
+        self._chunks = [np.zeros(1, dtype=np.int64)] if self.size else []
+        self._first_lines = [0] if self.size else []
+        self._count = 1 if self.size else 0
+        self.scanned = 0
+        self.complete = self.size == 0
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+
+    def build(self):
+        position = 0
+        while position < self.size and not self._cancelled.is_set():
+            length = min(self.chunk_size, self.size - position)
+            block = np.frombuffer(self._data, dtype=np.uint8, count=length, offset=position)
+            starts = np.flatnonzero(block == 10).astype(np.int64) + (position + 1)
+            del block  # le tampon exporté empêcherait la fermeture du mmap
+            position += length
+            if len(starts) and starts[-1] == self.size:
+                starts = starts[:-1]
+
+            with self._lock:
+                if len(starts):
+                    self._chunks.append(starts)
+                    self._first_lines.append(self._count)
+                    self._count += len(starts)
+                self.scanned = position
+        with self._lock:
+            self.complete = not self._cancelled.is_set()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    @property
+    def line_count(self) -> int:
+        """Lignes dont l'étendue est connue (la dernière ligne commencée attend sa fin)"""
+        with self._lock:
+            return self._count if self.complete else max(self._count - 1, 0)
+
+    def _start(self, line: int) -> int:
+        chunk = bisect_right(self._first_lines, line) - 1
+        return int(self._chunks[chunk][line - self._first_lines[chunk]])
+
+    def span(self, start: int, end: int):
+        """Étendue en octets des lignes [start, end), bornée aux lignes connues"""
+        with self._lock:
+            known = self._count if self.complete else max(self._count - 1, 0)
+            end = min(end, known)
+            if start >= end:
+                return 0, 0
+            stop = self._start(end) if end < self._count else self.size
+            return self._start(start), stop
+
+
+class VirtualFileView(ttk.Frame):
+    """Affichage en lecture seule d'un très gros fichier: seules les lignes visibles
+    sont décodées et insérées dans le widget, à partir d'un fichier mappé en mémoire."""
+
+    # Intervalle (ms) de rafraîchissement pendant l'indexation des lignes
+    INDEX_POLL_DELAY = 100
+
+    def __init__(self, parent, **text_options):
+        super().__init__(parent)
+        self.columnconfigure(0, weight=1)
+        self.rowconfigure(0, weight=1)
+
+        self.text = tk.Text(self, wrap=tk.NONE, **text_options)
+        self.text.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self._on_scroll)
+        self.scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
+
+        self.file_path = None
+        self._file = None
+        self._mmap = None
+        self._index = LineIndex(None)
+        self._index_thread = None
+        self._poll_job = None
+        self._rendered_lines = 0
+        self.top_line = 0
+
+        self.text.bind('<Configure>', lambda event: self.render())
+        self.text.bind('<MouseWheel>', self._on_mouse_wheel)
+        self.text.bind('<Button-4>', lambda event: self.scroll_lines(-3))
+        self.text.bind('<Button-5>', lambda event: self.scroll_lines(3))
+        self.text.bind('<Prior>', lambda event: self.scroll_lines(-self.visible_lines))
+        self.text.bind('<Next>', lambda event: self.scroll_lines(self.visible_lines))
+
+    @property
+    def line_count(self) -> int:
+        return self._index.line_count
+
+    @property
+    def visible_lines(self) -> int:
+        line_height = max(self.text.tk.call('font', 'metrics', self.text.cget('font'), '-linespace'), 1)
+        return max(self.text.winfo_height() // line_height, 1)
+
+    def open(self, file_path: str):
+        """Mappe le fichier et lance l'indexation des débuts de ligne hors du thread Tk"""
+        self.close()
+        self.file_path = file_path
+        self._file = open(file_path, 'rb')
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Fichier vide: rien à mapper
+            self._mmap = None
+
+        self._index = LineIndex(self._mmap)
+        self._index_thread = threading.Thread(target=self._index.build, daemon=True)
+        self._index_thread.start()
+
+        self.top_line = 0
+        self.render()
+        self._poll_job = self.after(self.INDEX_POLL_DELAY, self._poll_index)
+
+    def _poll_index(self):
+        """Affiche les lignes visibles dès qu'elles sont indexées, puis suit la progression"""
+        self._poll_job = None
+        complete = self._index.complete
+        if self._rendered_lines < self.visible_lines:
+            self.render()
+        else:
+            self._update_scrollbar()
+        if not complete:
+            self._poll_job = self.after(self.INDEX_POLL_DELAY, self._poll_index)
+
+    def close(self):
+        if self._poll_job is not None:
+            self.after_cancel(self._poll_job)
+            self._poll_job = None
+        if self._index_thread is not None:
+            self._index.cancel()
+            self._index_thread.join()
+            self._index_thread = None
+        self._index = LineIndex(None)
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self.file_path = None
+
+    def get_lines(self, start: int, count: int) -> str:
+        """Décode uniquement les lignes [start, start + count) déjà indexées"""
+        if self._mmap is None:
+            return ''
+        begin, stop = self._index.span(start, start + count)
+        return self._mmap[begin:stop].decode('utf-8', errors='replace')
+
+    def render(self):
+        self.top_line = max(0, min(self.top_line, self.line_count - self.visible_lines))
+        count = self.visible_lines
+
+        text = self.get_lines(self.top_line, count)
+        self._rendered_lines = text.count('\n') + (1 if text and not text.endswith('\n') else 0)
+        self.text.configure(state=tk.NORMAL)
+        self.text.delete('1.0', tk.END)
+        # Sans le dernier retour à la ligne: le widget en ajoute déjà un
+        self.text.insert('1.0', text[:-1] if text.endswith('\n') else text)
+        self.text.configure(state=tk.DISABLED)
+        self._update_scrollbar()
+
+    def _update_scrollbar(self):
+        total = max(self.line_count, 1)
+        self.scrollbar.set(self.top_line / total, min((self.top_line + self.visible_lines) / total, 1.0))
+
+    def scroll_lines(self, delta: int):
+        self.top_line += delta
+        self.render()
+        return 'break'
+
+    def _on_mouse_wheel(self, event):
+        return self.scroll_lines(-3 if event.delta > 0 else 3)
+
+    def _on_scroll(self, action, amount, unit=None):
+        if action == tk.MOVETO:
+            self.top_line = int(float(amount) * self.line_count)
+            self.render()
+        elif unit == tk.PAGES:
+            self.scroll_lines(int(amount) * self.visible_lines)
+        else:
+            self.scroll_lines(int(amount))
+
+
+class PagedTextWriter:
+    """Insère un long texte par pages successives pour ne pas bloquer la boucle Tk"""
+
+    def __init__(self, widget: tk.Text, page_lines: int = 200, delay_ms: int = 1):
+        self.widget = widget
+        self.page_lines = page_lines
+        self.delay_ms = delay_ms
+        self._job = None
+
+    def write(self, text: str):
+        self.cancel()
+        self.widget.delete('1.0', tk.END)
+        self._write_page(text.split('\n'), 0)
+
+    def _write_page(self, lines, start: int):
+        page = lines[start:start + self.page_lines]
+        if not page:
+            self._job = None
+            return
+        prefix = '\n' if start else ''
+        self.widget.insert(tk.END, prefix + '\n'.join(page))
+        self._job = self.widget.after(self.delay_ms, self._write_page, lines, start + self.page_lines)
+
+    def cancel(self):
+        if self._job is not None:
+            self.widget.after_cancel(self._job)
+            self._job = None